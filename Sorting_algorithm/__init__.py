@@ -0,0 +1,37 @@
+"""
+Sorting algorithms in plain Python: quicksort (an introsort), heapsort, insertionsort, mergesort,
+radixsort and countingsort, with NumPy versions, selection, priority queues, parallel and external sorting.
+
+    from Sorting_algorithm import sort
+    sort(values)                         # the algorithm is chosen from the data
+    sort(values, algorithm="mergesort")
+
+Importing the package only imports the dispatcher, every other module (NumPy, multiprocessing, ...)
+is imported the first time it is used. Each sort function is in the module with its name,
+for example Sorting_algorithm.heapsort.heapsort.
+"""
+from importlib import import_module
+
+from .dispatch import sort
+
+# name: (module, function) of the names that are imported the first time they are used
+LAZY = {
+    "nth_element": ("selection", "nth_element"),
+    "partial_sort": ("selection", "partial_sort"),
+    "top_k": ("selection", "top_k"),
+    "Heap": ("priority_queue", "Heap"),
+    "IndexedHeap": ("priority_queue", "IndexedHeap"),
+    "sort_file": ("external_sort", "external_sort"),
+}
+
+__all__ = ["sort"] + list(LAZY)
+
+
+def __getattr__(name):
+    """Imports a name of LAZY from its module when it is first asked for"""
+    if name not in LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attribute = LAZY[name]
+    value = getattr(import_module("." + module_name, __name__), attribute)
+    globals()[name] = value
+    return value
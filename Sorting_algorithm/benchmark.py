@@ -0,0 +1,322 @@
+"""
+Benchmarks of the sort functions on seeded generated data, the same seed always gives the same lists.
+The data sets have the shapes of the test_sort.py data (size x value range, almost sorted)
+and shapes that are hard for some algorithms (sorted, reversed, organ pipe, many duplicates).
+Every function is run WARMUP times and then timed REPEATS times, the min, median and standard deviation
+are reported with the number of comparisons and element writes of one run.
+
+    python -m Sorting_algorithm.benchmark [--algorithms quicksort heapsort] [--repeats 5]
+                        [--json out.json] [--csv out.csv] [--baseline old.json] [--tolerance 0.1]
+
+With --baseline the medians are compared with a saved --json file and the exit code is 1
+if any of them is more than tolerance slower.
+The speedup of parallel_sort per number of workers is measured with: python -m Sorting_algorithm.benchmark parallel
+The priority queues are compared with heapq with: python -m Sorting_algorithm.benchmark heap
+The import time of the package is measured with: python -m Sorting_algorithm.benchmark importtime
+"""
+import argparse
+import csv
+import heapq
+import json
+import random
+import os
+import statistics
+import subprocess
+import sys
+import time
+from functools import partial
+
+from .dispatch import sort
+from .heapsort import heapsort
+from .insertionsort import insertionsort
+from .instrumentation import count_operations
+from .mergesort import mergesort
+from .parallel_sort import parallel_sort
+from .priority_queue import Heap, IndexedHeap
+from .quicksort import quicksort
+from .radixsort import radixsort
+
+SEED = 2021
+WARMUP = 1
+REPEATS = 5
+TOLERANCE = 0.1 # a median more than 10% slower than the baseline is a regression
+WORKER_COUNTS = [1, 2, 4, 8]
+PARALLEL_SIZE = 1000000
+HEAP_OPERATIONS = 1000000
+IMPORT_RUNS = 5
+# modules that importing the package must not load, they are only needed by some backends
+HEAVY_MODULES = ["numpy", "concurrent.futures", "multiprocessing", "tempfile"]
+SHAPES = ["random", "almost_sorted", "sorted", "reversed", "organ_pipe", "duplicates"]
+# (number of items, largest value, shape)
+DATASETS = [(10000, 1000, "random"), (10000, 100000, "random"), (10000, 10000000, "random"),
+            (100000, 1000, "random"), (100000, 100000, "random"), (100000, 10000000, "random"),
+            (10000, 10000, "almost_sorted"), (50000, 10000, "almost_sorted"),
+            (50000, 10000000, "sorted"), (50000, 10000000, "reversed"),
+            (50000, 10000000, "organ_pipe"), (50000, 10000000, "duplicates")]
+
+
+def generate(size, limit, shape="random", seed=SEED):
+    """
+    Returns size random ints in (0, limit) arranged by shape:
+    random - as drawn
+    almost_sorted - sorted and 1% of them swapped
+    sorted, reversed - sorted ascending or descending
+    organ_pipe - ascending in the first half and descending in the second
+    duplicates - only 10 different values
+    """
+    rand = random.Random(seed)
+    if shape == "duplicates":
+        values = [rand.randint(0, limit) for _ in range(10)]
+        return [rand.choice(values) for _ in range(size)]
+    array = [rand.randint(0, limit) for _ in range(size)]
+    if shape != "random":
+        array.sort()
+    if shape == "almost_sorted":
+        for _ in range(size // 100):
+            i = rand.randrange(size)
+            j = rand.randrange(size)
+            array[i], array[j] = array[j], array[i]
+    elif shape == "reversed":
+        array.reverse()
+    elif shape == "organ_pipe":
+        array = array[0::2] + array[-1 - (size % 2)::-2]
+    return array
+
+
+def named(func, name, **kwargs):
+    """Returns func with kwargs filled in and a name for the report"""
+    result = partial(func, **kwargs)
+    result.__name__ = name
+    return result
+
+
+# name: (function, True if it only compares elements so its comparisons can be counted)
+ALGORITHMS = {
+    "sorted": (sorted, True),
+    "quicksort": (quicksort, True),
+    "heapsort": (heapsort, True),
+    "heapsort arity=4": (named(heapsort, "heapsort arity=4", arity=4), True),
+    "insertionsort": (insertionsort, True),
+    "mergesort": (mergesort, True),
+    "radixsort": (radixsort, False),
+    "auto": (named(sort, "auto", algorithm="auto"), False),
+}
+DEFAULT_ALGORITHMS = ["sorted", "quicksort", "heapsort", "mergesort", "radixsort", "auto"]
+
+
+def measure(func, array, repeats=REPEATS, warmup=WARMUP):
+    """Runs func on a fresh copy of array warmup times, then repeats times, returns the times of the timed runs"""
+    for _ in range(warmup):
+        func(array.copy())
+    times = []
+    for _ in range(repeats):
+        test_data = array.copy()
+        timestamp_before = time.perf_counter()
+        func(test_data)
+        times.append(time.perf_counter() - timestamp_before)
+    return times
+
+
+def run(algorithms=None, datasets=None, repeats=REPEATS, warmup=WARMUP, seed=SEED):
+    """
+    Benchmarks every algorithm (names in ALGORITHMS) on every data set and prints a table.
+    Returns a list with one dict of results per algorithm and data set.
+    """
+    results = []
+    for size, limit, shape in datasets or DATASETS:
+        array = generate(size, limit, shape, seed)
+        print(f'\nSorting {size} items, values (0,{limit}), {shape}')
+        print(f'{"Algorithm":20} {"Min":>9} {"Median":>9} {"Stddev":>9} {"Comparisons":>12} {"Writes":>10}')
+        print('-' * 74)
+        for name in algorithms or DEFAULT_ALGORITHMS:
+            func, counted = ALGORITHMS[name]
+            times = measure(func, array, repeats, warmup)
+            comparisons, writes = count_operations(func, array) if counted else (None, None)
+            result = {"algorithm": name, "size": size, "limit": limit, "shape": shape,
+                      "min": min(times), "median": statistics.median(times),
+                      "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                      "comparisons": comparisons, "writes": writes}
+            results.append(result)
+            print(f'{name:20} {result["min"]:9.4f} {result["median"]:9.4f} {result["stdev"]:9.4f} '
+                  f'{"-" if comparisons is None else comparisons:>12} {"-" if writes is None else writes:>10}')
+    return results
+
+
+def result_key(result):
+    """The algorithm and data set of a result, used to find the same benchmark in a baseline"""
+    return result["algorithm"], result["size"], result["limit"], result["shape"]
+
+
+def save_json(results, path, seed=SEED, repeats=REPEATS):
+    """Writes the results to path as JSON, the file can be used as a baseline later"""
+    with open(path, "w") as file:
+        json.dump({"seed": seed, "repeats": repeats, "python": sys.version.split()[0], "results": results},
+                  file, indent=2)
+
+
+def save_csv(results, path):
+    """Writes the results to path as CSV with one row per algorithm and data set"""
+    with open(path, "w", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def compare_baseline(results, path, tolerance=TOLERANCE):
+    """
+    Compares the medians with the ones in a JSON file written by save_json and prints the changes.
+    Returns the results that are more than tolerance slower than the baseline.
+    """
+    with open(path) as file:
+        baseline = {result_key(result): result for result in json.load(file)["results"]}
+    print(f'\nCompared with {path}')
+    print(f'{"Algorithm":20} {"Data set":32} {"Baseline":>9} {"Median":>9} {"Change":>8}')
+    print('-' * 82)
+    regressions = []
+    for result in results:
+        old = baseline.get(result_key(result))
+        if old is None:
+            continue
+        change = result["median"] / old["median"] - 1
+        flag = ''
+        if change > tolerance:
+            regressions.append(result)
+            flag = ' slower'
+        dataset = f'{result["size"]} (0,{result["limit"]}) {result["shape"]}'
+        print(f'{result["algorithm"]:20} {dataset:32} {old["median"]:9.4f} {result["median"]:9.4f} '
+              f'{change:+8.1%}{flag}')
+    return regressions
+
+
+def main(arguments):
+    """Runs the benchmark suite with the command line arguments, returns the exit code"""
+    parser = argparse.ArgumentParser(description="Benchmarks the sort functions on seeded data")
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=DEFAULT_ALGORITHMS)
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, help="only run the data sets of these shapes")
+    parser.add_argument("--repeats", type=int, default=REPEATS)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--json", help="write the results to this JSON file")
+    parser.add_argument("--csv", help="write the results to this CSV file")
+    parser.add_argument("--baseline", help="JSON file of an earlier run to compare with")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    args = parser.parse_args(arguments)
+    datasets = [dataset for dataset in DATASETS if args.shapes is None or dataset[2] in args.shapes]
+    results = run(args.algorithms, datasets, args.repeats, args.warmup, args.seed)
+    if args.json:
+        save_json(results, args.json, args.seed, args.repeats)
+    if args.csv:
+        save_csv(results, args.csv)
+    if args.baseline:
+        regressions = compare_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            print(f'\n{len(regressions)} regressions')
+            return 1
+    return 0
+
+
+def run_parallel(size=PARALLEL_SIZE):
+    """Sorts the same random list with parallel_sort and a growing number of workers, prints time and speedup"""
+    array = generate(size, 10000000)
+    print(f'\nparallel_sort of {size} items, values (0,10000000)')
+    print(f'{"Workers":10} {"Time (seconds)":>15} {"Speedup":>8}')
+    print('-' * 35)
+    base = None
+    for workers in WORKER_COUNTS:
+        test_data = array.copy()
+        timestamp_before = time.perf_counter()
+        parallel_sort(test_data, workers=workers, kernel=quicksort)
+        sec = time.perf_counter() - timestamp_before
+        base = base or sec
+        print(f'{workers:<10} {sec:15.4} {base / sec:8.2f}')
+
+
+def heapq_operations(values):
+    """push all values, pushpop each value once more and pop everything with heapq"""
+    heap = []
+    for value in values:
+        heapq.heappush(heap, value)
+    for value in values:
+        heapq.heappushpop(heap, value)
+    while heap:
+        heapq.heappop(heap)
+
+
+def heap_operations(values):
+    """The same operations as heapq_operations with Heap"""
+    heap = Heap()
+    for value in values:
+        heap.push(value)
+    for value in values:
+        heap.pushpop(value)
+    while len(heap):
+        heap.pop()
+
+
+def indexed_heap_operations(values):
+    """push all values with their index as item, update each priority once and pop everything with IndexedHeap"""
+    heap = IndexedHeap()
+    for i, value in enumerate(values):
+        heap.push(i, value)
+    for i, value in enumerate(reversed(values)):
+        heap.update(i, value)
+    while len(heap):
+        heap.pop()
+
+
+def run_heap(operations=HEAP_OPERATIONS):
+    """Times the same mix of operations on heapq, Heap and IndexedHeap"""
+    values = generate(operations // 3, 10000000)
+    print(f'\n{len(values) * 3} priority queue operations, values (0,10000000)')
+    print(f'{"Queue":25} {"Time (seconds)":>15} {"Operations/s":>14}')
+    print('-' * 56)
+    for func, name in [(heapq_operations, 'heapq'), (heap_operations, 'Heap'),
+                       (indexed_heap_operations, 'IndexedHeap')]:
+        timestamp_before = time.perf_counter()
+        func(values)
+        sec = time.perf_counter() - timestamp_before
+        print(f'{name:25} {sec:15.4} {len(values) * 3 / sec:14.0f}')
+
+
+def imported_modules(statement):
+    """Runs statement in a new interpreter with python -X importtime, returns {module: microseconds of its own import}"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=root,
+                            capture_output=True, text=True, check=True).stderr
+    modules = {}
+    for line in output.splitlines():
+        if line.startswith("import time:") and "cumulative" not in line:
+            self_time, _, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(self_time)
+    return modules
+
+
+def import_time(statement):
+    """Returns the microseconds of the imports that statement adds to the start of the interpreter and their modules"""
+    startup = imported_modules("pass")
+    modules = {name: time for name, time in imported_modules(statement).items() if name not in startup}
+    return sum(modules.values()), sorted(modules)
+
+
+def run_import_time(runs=IMPORT_RUNS):
+    """Prints the best import time of the package, of the first sort and checks that no heavy module is loaded"""
+    statements = [("import Sorting_algorithm", "import Sorting_algorithm"),
+                  ("first sort([3, 1, 2])", "import Sorting_algorithm; Sorting_algorithm.sort([3, 1, 2])")]
+    print(f'\n{"Statement":30} {"Best (ms)":>10} {"Modules":>8}  Heavy modules')
+    print('-' * 70)
+    for name, statement in statements:
+        results = [import_time(statement) for _ in range(runs)]
+        total, modules = min(results)
+        heavy = [module for module in modules if module.split(".")[0] in HEAVY_MODULES or module in HEAVY_MODULES]
+        print(f'{name:30} {total / 1000:10.2f} {len(modules):8}  {", ".join(heavy) or "none"}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == 'parallel':
+        run_parallel()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'heap':
+        run_heap()
+    elif len(sys.argv) > 1 and sys.argv[1] == 'importtime':
+        run_import_time()
+    else:
+        sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,28 @@
+"""
+This module sorts a list of integers with counting sort
+
+Every value is counted in a list with one counter per possible value, then the list is rewritten
+from the counters. The time and memory are O(n + k) where k is max - min + 1, so it is for small value ranges.
+"""
+
+def countingsort(array, lo=0, hi=None):
+    """Sorts the integers in array[lo:hi] in place with counting sort and returns array"""
+    if hi is None:
+        hi = len(array)
+    if hi - lo < 2:
+        return array
+    part = array[lo:hi]
+    minimum = min(part)
+    counts = [0] * (max(part) - minimum + 1)
+    for value in part:
+        counts[value - minimum] += 1
+    position = lo
+    for offset, count in enumerate(counts):
+        if count:
+            if isinstance(array, list):
+                array[position:position + count] = [minimum + offset] * count
+            else: #array.array and memoryview only take slices of their own type
+                for i in range(position, position + count):
+                    array[i] = minimum + offset
+            position += count
+    return array
@@ -0,0 +1,92 @@
+"""
+Picks the version of a sort function that fits the type of the input.
+numpy.ndarray gets the NumPy version from numpy_sort, everything else that supports indexing
+(list, array.array, memoryview) is sorted in place by the plain Python version.
+
+With algorithm "auto" the algorithm is chosen from the data: integers with a small value range
+use countingsort, other integers radixsort and everything else quicksort.
+The backend modules are imported the first time they are used, so importing the package stays cheap.
+"""
+import sys
+from importlib import import_module
+
+# algorithm name: (module, function) for lists and other sequences, (module, function) for numpy arrays,
+# None if the first one also handles numpy arrays
+BACKENDS = {
+    "quicksort": (("quicksort", "quicksort"), ("numpy_sort", "quicksort_numpy")),
+    "heapsort": (("heapsort", "heapsort"), ("numpy_sort", "heapsort_numpy")),
+    "insertionsort": (("insertionsort", "insertionsort"), ("numpy_sort", "insertionsort_numpy")),
+    "radixsort": (("radixsort", "radixsort"), ("numpy_sort", "radixsort_numpy")),
+    "countingsort": (("countingsort", "countingsort"), ("numpy_sort", "countingsort_numpy")),
+    "mergesort": (("mergesort", "mergesort"), None),
+    "parallel": (("parallel_sort", "parallel_sort"), None),
+}
+
+SMALL_LIMIT = 16 # lists this short are sorted by insertionsort
+COUNTING_FACTOR = 4 # countingsort is used when max - min < COUNTING_FACTOR * n
+SAMPLE_SIZE = 1024 # elements looked at to guess the number of distinct values
+DUPLICATE_FACTOR = 4 # fewer distinct values than sample / DUPLICATE_FACTOR goes to quicksort
+INT_TYPECODES = "bBhHiIlLqQnN" # array.array and memoryview formats of integers
+
+
+def is_ndarray(array):
+    """
+    Returns True if array is a numpy.ndarray.
+    NumPy is only looked up if it is already imported, an ndarray can not exist without it.
+    """
+    numpy = sys.modules.get("numpy")
+    return numpy is not None and isinstance(array, numpy.ndarray)
+
+
+def is_integers(array):
+    """Returns True if every element of array is an int"""
+    if is_ndarray(array):
+        return array.dtype.kind in "iu"
+    if isinstance(array, memoryview):
+        return array.format in INT_TYPECODES
+    typecode = getattr(array, "typecode", None)
+    if typecode is not None:
+        return typecode in INT_TYPECODES
+    return all(type(value) is int for value in array)
+
+
+def choose_algorithm(array):
+    """
+    Chooses the algorithm for "auto" from the size, the value range and the number of distinct values.
+    Integers are sorted without comparisons: countingsort if the range is at most a few times n,
+    otherwise radixsort. If a sample shows only a few distinct values quicksort is used instead,
+    its three way partitioning handles them in a few passes, fewer than radixsort needs for a wide range.
+    """
+    size = len(array)
+    if size <= SMALL_LIMIT:
+        return "insertionsort"
+    if not is_integers(array):
+        return "quicksort"
+    if is_ndarray(array):
+        span = int(array.max()) - int(array.min())
+    else:
+        span = max(array) - min(array)
+    if span < COUNTING_FACTOR * size:
+        return "countingsort"
+    sample = array[::max(1, size // SAMPLE_SIZE)]
+    if len(set(sample.tolist() if is_ndarray(sample) else sample)) * DUPLICATE_FACTOR <= len(sample):
+        return "quicksort"
+    return "radixsort"
+
+
+def backend(array, algorithm):
+    """Returns the sort function for algorithm that fits the type of array, "auto" chooses the algorithm"""
+    if algorithm == "auto":
+        algorithm = choose_algorithm(array)
+    python_backend, numpy_backend = BACKENDS[algorithm]
+    if numpy_backend is not None and is_ndarray(array):
+        module_name, function_name = numpy_backend
+    else:
+        module_name, function_name = python_backend
+    return getattr(import_module("." + module_name, __package__), function_name)
+
+
+def sort(array, algorithm="auto"):
+    """Sorts array in place with the backend of algorithm that fits its type and returns it"""
+    backend(array, algorithm)(array)
+    return array
@@ -0,0 +1,141 @@
+"""
+Sorts a file of integers that is larger than the memory, one integer per line like the test data files.
+The file is read in chunks that fit in memory, each chunk is sorted and written to a temporary file (a run)
+as binary 64 bit integers, then the runs are merged with a heap and the result is written line by line.
+"""
+import os
+import tempfile
+from array import array as typed_array
+from itertools import islice
+
+from .heapsort import heapify_items
+from .quicksort import quicksort
+
+MEMORY_LIMIT = 64 * 1024 * 1024 # bytes
+LIST_ITEM_BYTES = 40 # about what one int costs in a list: the int object and the pointer to it
+RUN_ITEM_BYTES = 8 # one int64 in a run file or a read buffer
+MAX_FAN_IN = 64 # the most runs merged at the same time, more runs are merged in several passes
+
+
+def write_run(values, directory, number):
+    """Writes the sorted values as int64 to a new run file and returns its path"""
+    path = os.path.join(directory, f"run{number}.bin")
+    with open(path, "wb") as file:
+        typed_array("q", values).tofile(file)
+    return path
+
+
+def read_run(path, buffer_items):
+    """Yields the values of a run file, reading buffer_items values at a time"""
+    with open(path, "rb") as file:
+        while True:
+            block = typed_array("q")
+            try:
+                block.fromfile(file, buffer_items)
+            except EOFError: #the last block is shorter, the values that were there are in block
+                yield from block
+                return
+            yield from block
+
+
+def merge_streams(streams, emit):
+    """
+    k-way merge of sorted streams, emit is called with each value in sorted order.
+    The heap of heapsort is a max heap, so it holds the negated next value of every stream
+    and the root is the smallest value.
+    """
+    keys = []
+    items = []
+    for stream_index, stream in enumerate(streams):
+        for value in stream:
+            keys.append(-value)
+            items.append(stream_index)
+            break
+    size = len(keys)
+    for i in range((size - 2) // 2, -1, -1):
+        heapify_items(keys, items, size, i)
+    while size:
+        emit(-keys[0])
+        value = next(streams[items[0]], None)
+        if value is None: #the stream is empty, the last leaf takes the place of the root
+            size -= 1
+            keys[0] = keys[size]
+            items[0] = items[size]
+        else:
+            keys[0] = -value
+        heapify_items(keys, items, size, 0)
+
+
+class BufferedWriter:
+    """Collects values and writes them to a file when the buffer is full, as text lines or as int64"""
+    def __init__(self, file, buffer_items, binary):
+        """file must be opened in binary mode if binary is True, else in text mode"""
+        self.file = file
+        self.buffer_items = buffer_items
+        self.binary = binary
+        self.buffer = []
+
+    def write(self, value):
+        """Adds a value, the buffer is flushed when it is full"""
+        self.buffer.append(value)
+        if len(self.buffer) >= self.buffer_items:
+            self.flush()
+
+    def flush(self):
+        """Writes the buffered values to the file"""
+        if self.buffer:
+            if self.binary:
+                typed_array("q", self.buffer).tofile(self.file)
+            else:
+                self.file.write("\n".join(map(str, self.buffer)) + "\n")
+            self.buffer = []
+
+
+def merge_files(paths, file, buffer_items, binary):
+    """Merges the run files in paths into the open file, as int64 if binary else as text lines"""
+    writer = BufferedWriter(file, buffer_items, binary)
+    merge_streams([read_run(path, buffer_items) for path in paths], writer.write)
+    writer.flush()
+
+
+def external_sort(input_path, output_path, memory_limit=MEMORY_LIMIT, kernel=quicksort, temp_dir=None):
+    """
+    Sorts the integers in input_path (one per line) and writes them to output_path, one per line.
+    At most memory_limit bytes of values are held in memory: a chunk while the runs are made,
+    or the read buffers of the runs that are merged. Each chunk is sorted by kernel.
+    The values must fit in a signed 64 bit integer. The runs are written to a temporary
+    directory (in temp_dir if it is given) that is removed at the end.
+    """
+    chunk_items = max(1, memory_limit // LIST_ITEM_BYTES)
+    buffer_items = max(1, memory_limit // RUN_ITEM_BYTES // (MAX_FAN_IN + 1))
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        runs = []
+        with open(input_path, "r") as file:
+            while True:
+                chunk = []
+                lines = 0
+                for line in islice(file, chunk_items):
+                    lines += 1
+                    if line.strip():
+                        chunk.append(int(line))
+                if lines == 0: #only the end of the file ends the loop, a chunk of blank lines does not
+                    break
+                if not chunk:
+                    continue
+                kernel(chunk)
+                runs.append(write_run(chunk, directory, len(runs)))
+                chunk = None
+        number = len(runs)
+        while len(runs) > MAX_FAN_IN: #merge passes until the runs can be merged at once
+            merged = []
+            for first in range(0, len(runs), MAX_FAN_IN):
+                path = os.path.join(directory, f"run{number}.bin")
+                number += 1
+                with open(path, "wb") as file:
+                    merge_files(runs[first:first + MAX_FAN_IN], file, buffer_items, True)
+                for old in runs[first:first + MAX_FAN_IN]:
+                    os.remove(old)
+                merged.append(path)
+            runs = merged
+        with open(output_path, "w") as file:
+            merge_files(runs, file, buffer_items, False)
@@ -1,49 +1,188 @@
 """
 This module sorts a list using the maxheap sorting algorithm
 
+The heap can have any number of children per node (arity), a 4-ary heap is less deep
+than a binary heap and its children are next to each other in the list.
+
+heapsort is not stable: elements with equal keys can end up in any order.
 """
 
-def heapify(array, size, index):
+ARITY = 2 # children per node when nothing else is given
+
+def heapify(array, size, index, offset=0, arity=ARITY):
     """
     array -  the array that we want to sort
     size - the lenght of A
     index - an index, it represents a node in the heap
+    offset - where the heap starts in array, so a part of a list can be a heap
+    arity - the number of children of each node
 
     This function checks if a node (i) is larger than its children, if its not the node is exchanged with its largest child.
-    We now need to check if the new child is larger than its new children and call this function agian on the new child.
+    Then the same check is done on the child, in a loop until the node is larger than its children or has none.
     """
-    left = 2 * index + 1
-    right = 2 * index + 2
-    largest = index
-    if left < size and array[left] > array[index]:
-        largest = left
-    if right < size and array[right] > array[largest]:
-        largest = right
-    if largest != index:
-        array[index], array[largest] = array[largest], array[index]
-        heapify(array, size, largest)
+    end = offset + size
+    index += offset
+    value = array[index]
+    child = arity * (index - offset) + offset + 1
+    while child < end:
+        last = child + arity
+        if last > end:
+            last = end
+        child_value = array[child]
+        for other in range(child + 1, last):
+            if array[other] > child_value:
+                child = other
+                child_value = array[other]
+        if child_value <= value:
+            break
+        array[index] = child_value
+        index = child
+        child = arity * (index - offset) + offset + 1
+    array[index] = value
 
-def extract(array, last):
+def sift_to_leaf(array, size, value, offset=0, arity=ARITY):
+    """
+    Floyds bottom up variant of heapify, used to put value at the root after an extraction.
+    The hole at the root is moved down to a leaf by always taking the largest child,
+    without comparing with value on the way. Then value is put in the hole and moved up while its parent is smaller.
+    value is usually small (it came from the bottom of the heap), so it only moves up a little
+    and about half of the comparisons of heapify are saved.
+    """
+    end = offset + size
+    index = offset
+    child = offset + 1
+    if arity == 2: #the binary heap is written out since it is the common case
+        while child < end:
+            child_value = array[child]
+            right = child + 1
+            if right < end and array[right] > child_value:
+                child = right
+                child_value = array[right]
+            array[index] = child_value
+            index = child
+            child = 2 * index - offset + 1
+    else:
+        while child < end:
+            last = child + arity
+            if last > end:
+                last = end
+            child_value = array[child]
+            for other in range(child + 1, last):
+                if array[other] > child_value:
+                    child = other
+                    child_value = array[other]
+            array[index] = child_value
+            index = child
+            child = arity * (index - offset) + offset + 1
+    while index > offset:
+        parent = (index - offset - 1) // arity + offset
+        parent_value = array[parent]
+        if parent_value >= value:
+            break
+        array[index] = parent_value
+        index = parent
+    array[index] = value
+
+def sift_up(array, index, offset=0, arity=ARITY):
+    """
+    Moves the value at index up while its parent is smaller, used when a value is added at the end of the heap
+    or a value in the heap got larger.
+    """
+    value = array[index]
+    while index > offset:
+        parent = (index - offset - 1) // arity + offset
+        parent_value = array[parent]
+        if parent_value >= value:
+            break
+        array[index] = parent_value
+        index = parent
+    array[index] = value
+
+def extract(array, last, offset=0):
     """
     The root and the last element in the heap switch position
     """
-    array[0], array[last] = array[last], array[0]
+    array[offset], array[offset + last] = array[offset + last], array[offset]
+
+def heapify_items(keys, items, size, index, arity=ARITY):
+    """heapify for a heap of keys where items[i] belongs to keys[i] and is moved with it"""
+    value = keys[index]
+    item = items[index]
+    child = arity * index + 1
+    while child < size:
+        last = min(child + arity, size)
+        for other in range(child + 1, last):
+            if keys[other] > keys[child]:
+                child = other
+        if keys[child] <= value:
+            break
+        keys[index] = keys[child]
+        items[index] = items[child]
+        index = child
+        child = arity * index + 1
+    keys[index] = value
+    items[index] = item
+
+def sift_to_leaf_items(keys, items, size, value, item, arity=ARITY):
+    """sift_to_leaf for a heap of keys where items[i] belongs to keys[i] and is moved with it"""
+    index = 0
+    child = 1
+    while child < size:
+        last = min(child + arity, size)
+        for other in range(child + 1, last):
+            if keys[other] > keys[child]:
+                child = other
+        keys[index] = keys[child]
+        items[index] = items[child]
+        index = child
+        child = arity * index + 1
+    while index > 0:
+        parent = (index - 1) // arity
+        if keys[parent] >= value:
+            break
+        keys[index] = keys[parent]
+        items[index] = items[parent]
+        index = parent
+    keys[index] = value
+    items[index] = item
 
-def heapsort(array):
+def heapsort_items(keys, items, arity=ARITY):
+    """Heapsorts the list keys and moves the elements of items the same way"""
+    size = len(keys)
+    for i in range((size - 2) // arity, -1, -1):
+        heapify_items(keys, items, size, i, arity)
+    for i in range(size - 1, 0, -1):
+        value = keys[i]
+        item = items[i]
+        keys[i] = keys[0]
+        items[i] = items[0]
+        sift_to_leaf_items(keys, items, i, value, item, arity)
+
+def heapsort(array, lo=0, hi=None, arity=ARITY, key=None, reverse=False):
     """
     This is the main program of heapsort.
+    lo and hi can be given to only sort array[lo:hi], arity sets the number of children per node.
+    key and reverse work like in sorted(), each key is computed once.
 
     First it starts building a max heap.
-    
-    Then it begins extracting elements, it takes the element from the root and switches it with the last element from the heap,
-    then the old root is removed from the heap. 
 
-    """
-    size = len(array)
-    start = size//2  
-    for i in range(start, -1, -1): #Reapetition of heapify makes a max heap
-        heapify(array, size, i)
-    for i in range(size - 1, 0, -1): #The sorted list gets build from back to front
-        extract(array, i)
-        heapify(array, i, 0)
+    Then it begins extracting elements, it takes the element from the root and puts it last in the heap,
+    the old last element is put back in the smaller heap with sift_to_leaf.
 
+    """
+    if hi is None:
+        hi = len(array)
+    size = hi - lo
+    if key is None:
+        for i in range((size - 2) // arity, -1, -1): #Reapetition of heapify makes a max heap
+            heapify(array, size, i, lo, arity)
+        for i in range(size - 1, 0, -1): #The sorted list gets build from back to front
+            value = array[lo + i]
+            array[lo + i] = array[lo]
+            sift_to_leaf(array, i, value, lo, arity)
+    else: #the keys are sorted in their own list and the elements follow them
+        items = array[lo:hi]
+        heapsort_items(list(map(key, items)), items, arity)
+        array[lo:hi] = items
+    if reverse:
+        array[lo:hi] = array[lo:hi][::-1]
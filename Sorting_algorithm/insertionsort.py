@@ -1,14 +1,43 @@
 """
 This module uses the insertion sort algorithm to sort a list
+
+insertionsort is stable: elements with equal keys keep their order, also with reverse=True.
 """
-def insertionsort(array):
+from bisect import bisect_right
+
+def insertionsort(array, lo=0, hi=None, key=None, reverse=False):
     """This function has loop that goes thru from index 1 to the last element.
-    It compares an element with the one previous in the list, if its smaller they switch places, if its larger it stays on place."""
-    size = len(array)
-    for i in range(1, size):
-        j = i - 1
-        while array[j] > array[i] and i > 0:
-            array[j], array[i] = array[i], array[j]
-            j -= 1
-            i -= 1
+    An element that is smaller than the one before it is moved back to its place in the sorted part:
+    the place is found with a binary search and the larger elements are moved one step with a single slice assignment.
+    The sorted run at the start is skipped and elements already in order cost one comparison,
+    so nearly sorted lists are sorted in close to linear time.
+    lo and hi can be given to only sort array[lo:hi], key and reverse work like in sorted()."""
+    if hi is None:
+        hi = len(array)
+    if reverse: #reversing before and after a stable sort keeps equal elements in order
+        array[lo:hi] = array[lo:hi][::-1]
+    if key is None:
+        insertion_kernel(array, lo, hi)
+    else: #the keys are computed once and sorted, the elements follow their keys
+        items = array[lo:hi]
+        insertion_kernel(list(map(key, items)), 0, hi - lo, items)
+        array[lo:hi] = items
+    if reverse:
+        array[lo:hi] = array[lo:hi][::-1]
     return array
+
+def insertion_kernel(keys, lo, hi, items=None):
+    """Binary insertion sort of keys[lo:hi], if items is given its elements are moved the same way as keys"""
+    start = lo + 1
+    while start < hi and not keys[start] < keys[start - 1]: #skip the presorted run
+        start += 1
+    for i in range(start, hi):
+        value = keys[i]
+        if value < keys[i - 1]:
+            position = bisect_right(keys, value, lo, i) #bisect_right keeps equal elements in order
+            keys[position + 1:i + 1] = keys[position:i]
+            keys[position] = value
+            if items is not None:
+                item = items[i]
+                items[position + 1:i + 1] = items[position:i]
+                items[position] = item
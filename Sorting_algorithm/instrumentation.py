@@ -0,0 +1,223 @@
+"""
+Opt-in statistics for the sort functions: comparisons, element writes, recursion depth,
+and the number of calls and the time spent in each kernel (partition3, heapify, sift_to_leaf, ...).
+
+    sink = MemorySink()
+    counted_heapsort = instrumented(heapsort, sink)
+    counted_heapsort(array)
+    sink.records[-1]["phases"]["heapify"] # calls and seconds of building the heap
+
+Nothing in the sort modules is changed for this: while an instrumented function runs the kernels are
+replaced in their modules by wrappers that count and time them, and put back afterwards.
+So the sorts have no overhead when they are not instrumented. Comparisons and writes are counted by
+sorting wrapped values in a list that counts its writes, which makes the timed phases slower,
+count=False only measures the phases. Not thread safe: only one instrumented call may run at a time.
+The sinks are also in Tree/instrumentation.py, the Tree folder can not import this package.
+"""
+import json
+import logging
+import sys
+import time
+from functools import wraps
+
+# functions that are timed, they are replaced in every module of MODULES that has them (imported ones too)
+KERNELS = ["partition3", "partition3_items", "heapify", "heapify_items", "sift_to_leaf", "sift_to_leaf_items",
+           "insertion_kernel", "count_run", "introselect"]
+MODULES = ["quicksort", "heapsort", "insertionsort", "mergesort", "selection", "priority_queue"]
+RECURSIVE = ["introsort", "introsort_items"] # their recursion depth is tracked
+METHODS = [("mergesort", "MergeState", "merge_at")]
+
+
+class Counter:
+    """The statistics of the running instrumented call"""
+    comparisons = 0
+    writes = 0
+    depth = 0
+    max_depth = 0
+    phases = {}
+
+
+class Counted:
+    """A value that counts its comparisons in Counter"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        Counter.comparisons += 1
+        return self.value < other.value
+
+    def __gt__(self, other):
+        Counter.comparisons += 1
+        return self.value > other.value
+
+    def __le__(self, other):
+        Counter.comparisons += 1
+        return self.value <= other.value
+
+    def __ge__(self, other):
+        Counter.comparisons += 1
+        return self.value >= other.value
+
+    def __eq__(self, other):
+        Counter.comparisons += 1
+        return self.value == other.value
+
+    __hash__ = None
+
+
+class CountingList(list):
+    """A list that counts the elements written into it in Counter, a swap is two writes"""
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            Counter.writes += len(value)
+        else:
+            Counter.writes += 1
+        super().__setitem__(index, value)
+
+
+class MemorySink:
+    """Keeps the records in a list"""
+    def __init__(self):
+        self.records = []
+
+    def record(self, stats):
+        """Adds the statistics of one call"""
+        self.records.append(stats)
+
+
+class LoggingSink:
+    """Logs every record on one line"""
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def record(self, stats):
+        """Logs the statistics of one call"""
+        self.logger.log(self.level, "%s", json.dumps(stats))
+
+
+class JsonSink:
+    """Appends every record to a file as one line of JSON"""
+    def __init__(self, path):
+        self.path = path
+
+    def record(self, stats):
+        """Writes the statistics of one call"""
+        with open(self.path, "a") as file:
+            file.write(json.dumps(stats) + "\n")
+
+
+def timed(original, name):
+    """Returns original wrapped so that its calls and time are added to Counter.phases[name]"""
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            phase = Counter.phases.setdefault(name, {"calls": 0, "seconds": 0.0})
+            phase["calls"] += 1
+            phase["seconds"] += time.perf_counter() - start
+    return wrapper
+
+
+def tracked(original):
+    """Returns original wrapped so that its recursion depth is kept in Counter"""
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        Counter.depth += 1
+        Counter.max_depth = max(Counter.max_depth, Counter.depth)
+        try:
+            return original(*args, **kwargs)
+        finally:
+            Counter.depth -= 1
+    return wrapper
+
+
+def patch():
+    """Replaces the kernels in the loaded sort modules by wrappers, returns what is needed to put them back"""
+    replaced = []
+    for module_name in MODULES:
+        module = sys.modules.get(f"{__package__}.{module_name}")
+        if module is None:
+            continue
+        for name in KERNELS + RECURSIVE:
+            original = getattr(module, name, None)
+            if original is not None:
+                wrapper = tracked(original) if name in RECURSIVE else timed(original, name)
+                replaced.append((module, name, original))
+                setattr(module, name, wrapper)
+    for module_name, class_name, name in METHODS:
+        module = sys.modules.get(f"{__package__}.{module_name}")
+        if module is not None:
+            cls = getattr(module, class_name)
+            original = cls.__dict__[name]
+            replaced.append((cls, name, original))
+            setattr(cls, name, timed(original, name))
+    return replaced
+
+
+def unpatch(replaced):
+    """Puts back the kernels replaced by patch"""
+    for owner, name, original in reversed(replaced):
+        setattr(owner, name, original)
+
+
+def count_operations(func, array):
+    """Returns (comparisons, writes) of one run of func on a copy of array"""
+    Counter.comparisons = 0
+    Counter.writes = 0
+    func(CountingList(Counted(value) for value in array))
+    return Counter.comparisons, Counter.writes
+
+
+def instrumented(func, sink=None, count=True, name=None):
+    """
+    Returns a version of the sort function func that sends a dict of statistics to sink (a MemorySink
+    if None, it is the sink attribute of the returned function) after every call:
+    function, size, seconds, comparisons, writes, max_depth and phases (calls and seconds per kernel).
+    If count is False the elements are not wrapped and comparisons and writes are None.
+    A key given by name is wrapped too, it gets the elements unwrapped and its keys are counted.
+    func must sort its first argument in place.
+    """
+    sink = sink if sink is not None else MemorySink()
+    name = name or getattr(func, "__name__", "sort")
+
+    @wraps(func)
+    def wrapper(array, *args, **kwargs):
+        Counter.comparisons = 0
+        Counter.writes = 0
+        Counter.depth = 0
+        Counter.max_depth = 0
+        Counter.phases = {}
+        replaced = patch()
+        start = time.perf_counter()
+        try:
+            if count:
+                data = CountingList(Counted(value) for value in array)
+                key = kwargs.get("key")
+                if key is not None: #the key sees the values of the caller, the comparisons are counted on its keys
+                    kwargs["key"] = lambda counted: Counted(key(counted.value))
+                result = func(data, *args, **kwargs)
+                if isinstance(array, list):
+                    array[:] = [value.value for value in data]
+                else:
+                    for i, value in enumerate(data):
+                        array[i] = value.value
+                if result is data:
+                    result = array
+            else:
+                result = func(array, *args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            unpatch(replaced)
+        sink.record({"function": name, "size": len(array), "seconds": seconds,
+                     "comparisons": Counter.comparisons if count else None,
+                     "writes": Counter.writes if count else None,
+                     "max_depth": Counter.max_depth, "phases": Counter.phases})
+        return result
+    wrapper.sink = sink
+    return wrapper
@@ -0,0 +1,369 @@
+"""
+This module sorts a list with an adaptive merge sort in the style of Timsort
+
+The list is split in natural runs: parts that are already ascending, or strictly descending ones that are reversed.
+Runs shorter than a minimum length are extended with insertionsort. The runs are kept on a stack and merged
+so that the stack stays short and runs of similar length are merged. While merging, if one run keeps
+winning the merge switches to galloping: the number of elements to take from that run is found with
+an exponential search and they are moved with one slice assignment.
+A sorted list is one run and is sorted with n - 1 comparisons, a list with a few runs takes close to linear time
+and a random list O(n log n).
+
+mergesort is stable: elements with equal keys keep their order, also with reverse=True.
+"""
+from bisect import bisect_left, bisect_right
+
+from .insertionsort import insertion_kernel
+
+MIN_MERGE = 32 # parts shorter than this are sorted by insertionsort alone
+MIN_GALLOP = 7 # elements in a row taken from one run before galloping starts
+
+
+def mergesort(array, lo=0, hi=None, key=None, reverse=False):
+    """
+    Sorts array[lo:hi] in place with a natural merge sort and returns array.
+    key and reverse work like in sorted(), each key is computed once.
+    """
+    if hi is None:
+        hi = len(array)
+    if reverse: #reversing before and after a stable sort keeps equal elements in order
+        array[lo:hi] = array[lo:hi][::-1]
+    if key is None and isinstance(array, list):
+        merge_kernel(array, lo, hi)
+    else: #the keys are computed once and sorted, the elements follow their keys
+        #the merges copy runs to lists, array.array and memoryview only take slices of their own type
+        items = list(array[lo:hi])
+        merge_kernel(items if key is None else list(map(key, items)), 0, hi - lo, None if key is None else items)
+        if isinstance(array, list):
+            array[lo:hi] = items
+        else:
+            for i, value in enumerate(items, lo):
+                array[i] = value
+    if reverse:
+        array[lo:hi] = array[lo:hi][::-1]
+    return array
+
+
+def min_run_length(size):
+    """
+    Returns the minimum run length for size elements, between MIN_MERGE/2 and MIN_MERGE,
+    chosen so that size / min_run is a power of two or a little less, which keeps the merges balanced.
+    """
+    rest = 0
+    while size >= MIN_MERGE:
+        rest |= size & 1
+        size >>= 1
+    return size + rest
+
+
+def count_run(keys, lo, hi, items=None):
+    """
+    Returns the end of the run that starts at lo. A strictly descending run is reversed,
+    equal elements do not end an ascending run and are never reversed, so the order of equal elements is kept.
+    """
+    end = lo + 1
+    if end == hi:
+        return end
+    if keys[end] < keys[lo]:
+        end += 1
+        while end < hi and keys[end] < keys[end - 1]:
+            end += 1
+        keys[lo:end] = keys[lo:end][::-1]
+        if items is not None:
+            items[lo:end] = items[lo:end][::-1]
+    else:
+        end += 1
+        while end < hi and not keys[end] < keys[end - 1]:
+            end += 1
+    return end
+
+
+def gallop_left(keys, value, lo, hi):
+    """Like bisect_left on keys[lo:hi], but the search starts at lo with steps 1, 2, 4, ... so positions near lo are found fast"""
+    last = lo
+    offset = 1
+    while lo + offset <= hi and keys[lo + offset - 1] < value:
+        last = lo + offset
+        offset *= 2
+    return bisect_left(keys, value, last, min(lo + offset - 1, hi))
+
+
+def gallop_right(keys, value, lo, hi):
+    """Like bisect_right on keys[lo:hi], but the search starts at lo"""
+    last = lo
+    offset = 1
+    while lo + offset <= hi and not value < keys[lo + offset - 1]:
+        last = lo + offset
+        offset *= 2
+    return bisect_right(keys, value, last, min(lo + offset - 1, hi))
+
+
+def gallop_left_back(keys, value, lo, hi):
+    """Like bisect_left on keys[lo:hi], but the search starts at hi and goes towards lo"""
+    last = hi
+    offset = 1
+    while hi - offset >= lo and not keys[hi - offset] < value:
+        last = hi - offset
+        offset *= 2
+    return bisect_left(keys, value, max(hi - offset + 1, lo), last)
+
+
+def gallop_right_back(keys, value, lo, hi):
+    """Like bisect_right on keys[lo:hi], but the search starts at hi and goes towards lo"""
+    last = hi
+    offset = 1
+    while hi - offset >= lo and value < keys[hi - offset]:
+        last = hi - offset
+        offset *= 2
+    return bisect_right(keys, value, max(hi - offset + 1, lo), last)
+
+
+class MergeState:
+    """
+    The stack of runs waiting to be merged and the scratch lists used by the merges.
+    The scratch lists are made once and reused, they grow to the length of the shorter run of the largest merge.
+    """
+    def __init__(self, keys, items=None):
+        self.keys = keys
+        self.items = items
+        self.scratch_keys = []
+        self.scratch_items = []
+        self.min_gallop = MIN_GALLOP
+        self.runs = [] # [start, length] of every run, the last run is at the top
+
+    def push_run(self, start, length):
+        """Puts a run on the stack and merges runs until the stack is balanced again"""
+        self.runs.append([start, length])
+        self.merge_collapse()
+
+    def merge_collapse(self):
+        """
+        Merges runs at the top of the stack until, for the top runs A, B, C (C at the top), A > B + C and B > C.
+        Then the lengths grow at least as fast as the Fibonacci numbers and the stack has O(log n) runs.
+        """
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if (n > 0 and runs[n - 1][1] <= runs[n][1] + runs[n + 1][1]) or \
+                    (n > 1 and runs[n - 2][1] <= runs[n - 1][1] + runs[n][1]):
+                if runs[n - 1][1] < runs[n + 1][1]:
+                    n -= 1
+                self.merge_at(n)
+            elif runs[n][1] <= runs[n + 1][1]:
+                self.merge_at(n)
+            else:
+                break
+
+    def merge_force_collapse(self):
+        """Merges all runs on the stack into one, the shorter neighbour first"""
+        runs = self.runs
+        while len(runs) > 1:
+            n = len(runs) - 2
+            if n > 0 and runs[n - 1][1] < runs[n + 1][1]:
+                n -= 1
+            self.merge_at(n)
+
+    def merge_at(self, n):
+        """
+        Merges run n and run n + 1 of the stack. The start of run n that is already in place
+        and the end of run n + 1 that is already in place are skipped first, then the shorter rest is
+        copied to the scratch list.
+        """
+        keys = self.keys
+        lo, length = self.runs[n]
+        mid = lo + length
+        hi = mid + self.runs[n + 1][1]
+        self.runs[n][1] = hi - lo
+        del self.runs[n + 1]
+        lo = gallop_right(keys, keys[mid], lo, mid)
+        if lo == mid:
+            return
+        hi = gallop_left_back(keys, keys[mid - 1], mid, hi)
+        if mid - lo <= hi - mid:
+            self.merge_lo(lo, mid, hi)
+        else:
+            self.merge_hi(lo, mid, hi)
+
+    def merge_lo(self, lo, mid, hi):
+        """
+        Merges keys[lo:mid] and keys[mid:hi] from the front, the left run is the shorter one and is copied to scratch.
+        keys[mid] is smaller than keys[lo] and keys[mid-1] is larger than keys[hi-1], merge_at makes sure of that.
+        """
+        keys = self.keys
+        items = self.items
+        scratch = self.scratch_keys
+        scratch_items = self.scratch_items
+        size = mid - lo
+        scratch[:size] = keys[lo:mid]
+        if items is not None:
+            scratch_items[:size] = items[lo:mid]
+        i = 0
+        j = mid
+        dest = lo
+        min_gallop = self.min_gallop
+        while i < size and j < hi:
+            count_left = 0
+            count_right = 0
+            while count_left < min_gallop and count_right < min_gallop: #one element at a time
+                if keys[j] < scratch[i]:
+                    keys[dest] = keys[j]
+                    if items is not None:
+                        items[dest] = items[j]
+                    j += 1
+                    count_right += 1
+                    count_left = 0
+                else:
+                    keys[dest] = scratch[i]
+                    if items is not None:
+                        items[dest] = scratch_items[i]
+                    i += 1
+                    count_left += 1
+                    count_right = 0
+                dest += 1
+                if i == size or j == hi:
+                    break
+            if i == size or j == hi:
+                break
+            while True: #galloping, blocks of elements are moved at once
+                end = gallop_right(scratch, keys[j], i, size)
+                count_left = end - i
+                keys[dest:dest + count_left] = scratch[i:end]
+                if items is not None:
+                    items[dest:dest + count_left] = scratch_items[i:end]
+                dest += count_left
+                i = end
+                if i == size:
+                    break
+                keys[dest] = keys[j]
+                if items is not None:
+                    items[dest] = items[j]
+                dest += 1
+                j += 1
+                if j == hi:
+                    break
+                end = gallop_left(keys, scratch[i], j, hi)
+                count_right = end - j
+                keys[dest:dest + count_right] = keys[j:end]
+                if items is not None:
+                    items[dest:dest + count_right] = items[j:end]
+                dest += count_right
+                j = end
+                if j == hi:
+                    break
+                keys[dest] = scratch[i]
+                if items is not None:
+                    items[dest] = scratch_items[i]
+                dest += 1
+                i += 1
+                if i == size:
+                    break
+                if min_gallop > 1:
+                    min_gallop -= 1
+                if count_left < MIN_GALLOP and count_right < MIN_GALLOP:
+                    min_gallop += 2 #galloping did not pay off, it starts later next time
+                    break
+        if i < size: #the rest of the left run goes to the end
+            keys[dest:hi] = scratch[i:size]
+            if items is not None:
+                items[dest:hi] = scratch_items[i:size]
+        self.min_gallop = min_gallop
+
+    def merge_hi(self, lo, mid, hi):
+        """Merges keys[lo:mid] and keys[mid:hi] from the back, the right run is the shorter one and is copied to scratch"""
+        keys = self.keys
+        items = self.items
+        scratch = self.scratch_keys
+        scratch_items = self.scratch_items
+        size = hi - mid
+        scratch[:size] = keys[mid:hi]
+        if items is not None:
+            scratch_items[:size] = items[mid:hi]
+        i = size - 1
+        j = mid - 1
+        dest = hi - 1
+        min_gallop = self.min_gallop
+        while i >= 0 and j >= lo:
+            count_left = 0
+            count_right = 0
+            while count_left < min_gallop and count_right < min_gallop: #one element at a time
+                if scratch[i] < keys[j]:
+                    keys[dest] = keys[j]
+                    if items is not None:
+                        items[dest] = items[j]
+                    j -= 1
+                    count_left += 1
+                    count_right = 0
+                else:
+                    keys[dest] = scratch[i]
+                    if items is not None:
+                        items[dest] = scratch_items[i]
+                    i -= 1
+                    count_right += 1
+                    count_left = 0
+                dest -= 1
+                if i < 0 or j < lo:
+                    break
+            if i < 0 or j < lo:
+                break
+            while True: #galloping, blocks of elements are moved at once
+                end = gallop_right_back(keys, scratch[i], lo, j + 1)
+                count_left = j + 1 - end
+                keys[dest - count_left + 1:dest + 1] = keys[end:j + 1]
+                if items is not None:
+                    items[dest - count_left + 1:dest + 1] = items[end:j + 1]
+                dest -= count_left
+                j = end - 1
+                if j < lo:
+                    break
+                keys[dest] = scratch[i]
+                if items is not None:
+                    items[dest] = scratch_items[i]
+                dest -= 1
+                i -= 1
+                if i < 0:
+                    break
+                end = gallop_left_back(scratch, keys[j], 0, i + 1)
+                count_right = i + 1 - end
+                keys[dest - count_right + 1:dest + 1] = scratch[end:i + 1]
+                if items is not None:
+                    items[dest - count_right + 1:dest + 1] = scratch_items[end:i + 1]
+                dest -= count_right
+                i = end - 1
+                if i < 0:
+                    break
+                keys[dest] = keys[j]
+                if items is not None:
+                    items[dest] = items[j]
+                dest -= 1
+                j -= 1
+                if j < lo:
+                    break
+                if min_gallop > 1:
+                    min_gallop -= 1
+                if count_left < MIN_GALLOP and count_right < MIN_GALLOP:
+                    min_gallop += 2 #galloping did not pay off, it starts later next time
+                    break
+        if i >= 0: #the rest of the right run goes to the start
+            keys[lo:lo + i + 1] = scratch[:i + 1]
+            if items is not None:
+                items[lo:lo + i + 1] = scratch_items[:i + 1]
+        self.min_gallop = min_gallop
+
+
+def merge_kernel(keys, lo, hi, items=None):
+    """Natural merge sort of keys[lo:hi], if items is given its elements are moved the same way as keys"""
+    size = hi - lo
+    if size < MIN_MERGE:
+        insertion_kernel(keys, lo, hi, items)
+        return
+    state = MergeState(keys, items)
+    min_run = min_run_length(size)
+    start = lo
+    while start < hi:
+        end = count_run(keys, start, hi, items)
+        if end - start < min_run: #short runs are extended, insertion_kernel skips the part that is already sorted
+            end = min(start + min_run, hi)
+            insertion_kernel(keys, start, end, items)
+        state.push_run(start, end - start)
+        start = end
+    state.merge_force_collapse()
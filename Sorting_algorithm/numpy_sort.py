@@ -0,0 +1,209 @@
+"""
+NumPy versions of quicksort, heapsort, insertionsort, radixsort and countingsort.
+They sort a one dimensional numpy.ndarray (or a slice of it) in place, the partitioning and the heap building
+work on whole slices at once. The steps that move one element at a time (the extractions of heapsort,
+the insertions of insertionsort) run on a list copy, an ndarray is slow to index one element at a time.
+NaN values are moved to the end first, like numpy.sort does.
+"""
+import numpy as np
+
+from .heapsort import sift_to_leaf
+from .insertionsort import insertion_kernel
+
+DIGIT_BITS = 16 # radixsort_numpy digits, numpy.argsort sorts 16 bit keys with its own radix sort
+BLOCK_LIMIT = 64 # quicksort_numpy stops partitioning parts with this many elements or less
+
+
+def move_nans_last(array, lo, hi):
+    """Moves NaN values in array[lo:hi] to the end and returns where they start"""
+    if array.dtype.kind not in "fc":
+        return hi
+    part = array[lo:hi]
+    nans = np.isnan(part)
+    count = int(np.count_nonzero(nans))
+    if count:
+        part[:len(part) - count] = part[~nans]
+        part[len(part) - count:] = np.nan
+    return hi - count
+
+
+def quicksort_numpy(array, lo=0, hi=None):
+    """
+    Introsort like quicksort.quicksort, but each partition is done with boolean masks over the whole part.
+    The elements smaller than the pivot, equal to it and larger than it are written back as three blocks.
+    Partitioning stops at blocks of BLOCK_LIMIT elements, the blocks are in the right order
+    and are all sorted together at the end by transposition_sort.
+    """
+    if hi is None:
+        hi = len(array)
+    hi = move_nans_last(array, lo, hi)
+    if hi - lo > 1:
+        introsort_numpy(array, lo, hi, 2 * (hi - lo).bit_length())
+        transposition_sort(array[lo:hi], min(hi - lo, BLOCK_LIMIT))
+
+
+def introsort_numpy(array, lo, hi, depth_limit):
+    """
+    Partitions array[lo:hi] until every block has at most BLOCK_LIMIT elements,
+    recursing into the smaller part and looping on the larger one
+    """
+    while hi - lo > BLOCK_LIMIT:
+        if depth_limit == 0:
+            heapsort_numpy(array, lo, hi)
+            return
+        depth_limit -= 1
+        part = array[lo:hi]
+        pivot = np.sort(part[[0, len(part) // 2, -1]])[1]
+        smaller = part[part < pivot]
+        larger = part[part > pivot]
+        lower = lo + len(smaller)
+        upper = hi - len(larger)
+        array[lo:lower] = smaller
+        array[lower:upper] = pivot
+        array[upper:hi] = larger
+        if lower - lo < hi - upper:
+            introsort_numpy(array, lo, lower, depth_limit)
+            lo = upper
+        else:
+            introsort_numpy(array, upper, hi, depth_limit)
+            hi = lower
+
+
+def transposition_sort(part, passes):
+    """
+    Odd-even transposition sort: each pass compares every pair (i, i+1), starting at an even i
+    and then at an odd i, and puts the smaller one first, one vectorized step over the whole part.
+    If part is made of blocks of at most passes elements that are already in the right order
+    between each other, no pair across two blocks is ever swapped and every block is sorted after passes passes.
+    It stops early when a pass swaps nothing.
+    """
+    size = len(part)
+    unchanged = 0
+    for step in range(passes):
+        start = step % 2
+        left = part[start:size - 1:2]
+        right = part[start + 1:size:2]
+        swap = left > right
+        if swap.any():
+            unchanged = 0
+            smaller = right[swap]
+            right[swap] = left[swap]
+            left[swap] = smaller
+        else:
+            unchanged += 1
+            if unchanged == 2:
+                return
+
+
+def build_heap_numpy(heap):
+    """
+    Makes heap a binary max heap. The nodes on one level have separate subtrees,
+    so a whole level is sifted down at the same time with index arrays, starting at the lowest level.
+    """
+    size = len(heap)
+    last_parent = (size - 2) // 2
+    if last_parent < 0:
+        return
+    for level in range((last_parent + 1).bit_length() - 1, -1, -1):
+        nodes = np.arange(2 ** level - 1, min(2 ** (level + 1) - 1, last_parent + 1))
+        while nodes.size:
+            child = 2 * nodes + 1
+            right = child + 1
+            has_right = right < size
+            right_larger = np.zeros(len(nodes), dtype=bool)
+            right_larger[has_right] = heap[right[has_right]] > heap[child[has_right]]
+            child[right_larger] += 1
+            swap = heap[child] > heap[nodes]
+            nodes = nodes[swap]
+            child = child[swap]
+            heap[nodes], heap[child] = heap[child], heap[nodes]
+            nodes = child[child <= last_parent]
+
+
+def heapsort_numpy(array, lo=0, hi=None):
+    """
+    Heapsort on array[lo:hi]. The heap is built level by level with build_heap_numpy.
+    The extractions depend on each other and are done one by one with heapsort.sift_to_leaf on a list copy,
+    reading and writing single elements of a list is much faster than of an ndarray.
+    """
+    if hi is None:
+        hi = len(array)
+    hi = move_nans_last(array, lo, hi)
+    heap = array[lo:hi]
+    build_heap_numpy(heap)
+    values = heap.tolist()
+    for i in range(len(values) - 1, 0, -1):
+        value = values[i]
+        values[i] = values[0]
+        sift_to_leaf(values, i, value)
+    heap[:] = values
+    return array
+
+
+def insertionsort_numpy(array, lo=0, hi=None):
+    """
+    Binary insertion sort on array[lo:hi]. The first element that is out of order is found with one
+    comparison of the whole part against itself shifted by one. From there the part is sorted as a list
+    with insertionsort.insertion_kernel, single elements of a list are much faster to move than of an ndarray.
+    """
+    if hi is None:
+        hi = len(array)
+    hi = move_nans_last(array, lo, hi)
+    part = array[lo:hi]
+    descents = np.flatnonzero(part[1:] < part[:-1])
+    if not descents.size:
+        return array
+    values = part.tolist()
+    insertion_kernel(values, 0, len(values))
+    part[:] = values
+    return array
+
+
+def offsets(part, minimum):
+    """
+    Returns part - minimum as uint64. The subtraction is done in 64 bit unsigned arithmetic,
+    which is exact for every integer dtype, part - minimum in the dtype of part can overflow (int8, uint64 near 2**64).
+    """
+    wide = part.astype(np.int64 if part.dtype.kind == "i" else np.uint64).view(np.uint64)
+    return wide - np.uint64(int(minimum) % 2 ** 64)
+
+
+def from_offsets(shifted, minimum, dtype):
+    """Returns shifted + minimum converted to dtype, the inverse of offsets"""
+    wide = shifted + np.uint64(int(minimum) % 2 ** 64)
+    if np.dtype(dtype).kind == "i":
+        wide = wide.view(np.int64)
+    return wide.astype(dtype)
+
+
+def countingsort_numpy(array, lo=0, hi=None):
+    """Counting sort of the integers in array[lo:hi], the counting is done by numpy.bincount"""
+    if hi is None:
+        hi = len(array)
+    part = array[lo:hi]
+    if len(part) < 2:
+        return array
+    minimum = part.min()
+    counts = np.bincount(offsets(part, minimum).astype(np.intp))
+    part[:] = from_offsets(np.repeat(np.arange(len(counts), dtype=np.uint64), counts), minimum, part.dtype)
+    return array
+
+
+def radixsort_numpy(array, lo=0, hi=None):
+    """
+    LSD radix sort of the integers in array[lo:hi]. Each pass takes one 16 bit digit of value - min
+    and reorders the whole part by it with a stable numpy.argsort, which is a radix sort for 16 bit keys.
+    """
+    if hi is None:
+        hi = len(array)
+    part = array[lo:hi]
+    if len(part) < 2:
+        return array
+    minimum = part.min()
+    shifted = offsets(part, minimum)
+    mask = np.uint64((1 << DIGIT_BITS) - 1)
+    for shift in range(0, int(shifted.max()).bit_length(), DIGIT_BITS):
+        digits = ((shifted >> np.uint64(shift)) & mask).astype(np.uint16)
+        shifted = shifted[np.argsort(digits, kind="stable")]
+    part[:] = from_offsets(shifted, minimum, part.dtype)
+    return array
@@ -0,0 +1,107 @@
+"""
+Sorts a list on several cores: the list is split in chunks that are sorted by worker processes
+and the sorted chunks are merged with a heap.
+"""
+import os
+from array import array as typed_array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from .heapsort import heapify_items
+from .quicksort import quicksort
+
+MIN_CHUNK = 10000 # smaller lists are not worth starting processes for
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def sort_shared_chunk(name, lo, hi, kernel):
+    """
+    Runs in a worker: sorts values lo to hi of the int64 shared memory block name.
+    The chunk is copied to a list, sorted by kernel and written back, nothing is pickled but the arguments.
+    """
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        view = block.buf.cast("q")
+        chunk = view[lo:hi].tolist()
+        kernel(chunk)
+        view[lo:hi] = typed_array("q", chunk)
+        view.release()
+    finally:
+        block.close()
+
+
+def sort_chunk(chunk, kernel):
+    """Runs in a worker: sorts a pickled chunk with kernel and sends it back"""
+    kernel(chunk)
+    return chunk
+
+
+def merge_runs(runs, output):
+    """
+    k-way merge of the sorted runs into output with the max heap of heapsort.
+    The heap holds the last value of every run, so output is filled from the back:
+    the largest value is taken from the root and replaced by the next value of its run.
+    """
+    keys = []
+    items = []
+    positions = []
+    for run_index, run in enumerate(runs):
+        if len(run):
+            keys.append(run[-1])
+            items.append(run_index)
+        positions.append(len(run) - 1)
+    size = len(keys)
+    for i in range((size - 2) // 2, -1, -1):
+        heapify_items(keys, items, size, i)
+    for out in range(len(output) - 1, -1, -1):
+        output[out] = keys[0]
+        run_index = items[0]
+        positions[run_index] -= 1
+        if positions[run_index] >= 0:
+            keys[0] = runs[run_index][positions[run_index]]
+        else: #the run is empty, the last leaf takes the place of the root
+            size -= 1
+            keys[0] = keys[size]
+            items[0] = items[size]
+        heapify_items(keys, items, size, 0)
+
+
+def fits_int64(array):
+    """Returns True if all values are ints that fit in a signed 64 bit integer"""
+    return all(type(value) is int and INT64_MIN <= value <= INT64_MAX for value in array)
+
+
+def parallel_sort(array, workers=None, kernel=quicksort):
+    """
+    Sorts array in place using workers processes (all cores if None), each sorting a chunk with kernel.
+    kernel must be a module level function (quicksort, heapsort, insertionsort, ...) so it can be sent to the workers.
+    Lists of 64 bit ints are shared with the workers in a shared memory block instead of being pickled.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    size = len(array)
+    workers = max(1, min(workers, size // MIN_CHUNK))
+    if workers == 1:
+        kernel(array)
+        return array
+    bounds = [size * i // workers for i in range(workers + 1)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        if fits_int64(array):
+            block = shared_memory.SharedMemory(create=True, size=size * 8)
+            try:
+                view = block.buf.cast("q")
+                view[:] = typed_array("q", array)
+                futures = [executor.submit(sort_shared_chunk, block.name, bounds[i], bounds[i + 1], kernel)
+                           for i in range(workers)]
+                for future in futures:
+                    future.result()
+                merge_runs([view[bounds[i]:bounds[i + 1]] for i in range(workers)], array)
+                view.release()
+            finally:
+                block.close()
+                block.unlink()
+        else:
+            chunks = [array[bounds[i]:bounds[i + 1]] for i in range(workers)]
+            merge_runs(list(executor.map(sort_chunk, chunks, [kernel] * workers)), array)
+    return array
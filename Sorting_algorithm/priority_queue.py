@@ -0,0 +1,220 @@
+"""
+Priority queues built on the max heap of heapsort, the largest element is always at the root.
+
+Heap holds values (or (priority, item) tuples) in a list and uses heapify, sift_to_leaf and sift_up from heapsort.
+IndexedHeap stores each item with a separate priority and remembers where every item is in the heap,
+so the priority of an item can be changed and an item can be removed without searching for it.
+For a queue where the smallest priority comes first, push the negated priorities.
+"""
+from .heapsort import ARITY, heapify, sift_to_leaf, sift_up
+
+
+class Heap:
+    """Max heap of values, pop returns the largest value"""
+    def __init__(self, iterable=(), arity=ARITY):
+        """The values of iterable are put in the heap in O(n) time, arity is the number of children per node"""
+        self.array = list(iterable)
+        self.arity = arity
+        size = len(self.array)
+        for i in range((size - 2) // arity, -1, -1):
+            heapify(self.array, size, i, 0, arity)
+
+    def __len__(self):
+        return len(self.array)
+
+    def push(self, value):
+        """Adds value to the heap in O(log n)"""
+        self.array.append(value)
+        sift_up(self.array, len(self.array) - 1, 0, self.arity)
+
+    def pop(self):
+        """Removes and returns the largest value, returns None if the heap is empty"""
+        array = self.array
+        if not array:
+            return None
+        value = array.pop()
+        if not array:
+            return value
+        largest = array[0]
+        sift_to_leaf(array, len(array), value, 0, self.arity)
+        return largest
+
+    def peek(self):
+        """Returns the largest value without removing it, returns None if the heap is empty"""
+        if not self.array:
+            return None
+        return self.array[0]
+
+    def pushpop(self, value):
+        """
+        Pushes value and pops the largest value, faster than push followed by pop.
+        If value is at least as large as the root it is returned at once and the heap is not changed.
+        """
+        array = self.array
+        if not array or array[0] <= value:
+            return value
+        largest = array[0]
+        array[0] = value
+        heapify(array, len(array), 0, 0, self.arity)
+        return largest
+
+    def replace(self, value):
+        """Pops the largest value and then pushes value, returns None and pushes value if the heap is empty"""
+        array = self.array
+        if not array:
+            array.append(value)
+            return None
+        largest = array[0]
+        array[0] = value
+        heapify(array, len(array), 0, 0, self.arity)
+        return largest
+
+
+class IndexedHeap:
+    """
+    Max heap of items with priorities, pop returns the item with the largest priority.
+    Every item can only be in the heap once and must be hashable, it is its own handle:
+    positions maps each item to its index so update and remove find it in O(1).
+    """
+    def __init__(self, pairs=(), arity=ARITY):
+        """pairs is an iterable of (item, priority), the heap is built in O(n) time"""
+        self.items = []
+        self.priorities = []
+        self.positions = {}
+        self.arity = arity
+        for item, priority in pairs:
+            if item in self.positions:
+                self.priorities[self.positions[item]] = priority
+            else:
+                self.positions[item] = len(self.items)
+                self.items.append(item)
+                self.priorities.append(priority)
+        for i in range((len(self.items) - 2) // arity, -1, -1):
+            self.sift_down(i)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def sift_up(self, index):
+        """Moves the item at index up while its parent has a smaller priority"""
+        items = self.items
+        priorities = self.priorities
+        positions = self.positions
+        item = items[index]
+        priority = priorities[index]
+        while index > 0:
+            parent = (index - 1) // self.arity
+            if priorities[parent] >= priority:
+                break
+            items[index] = items[parent]
+            priorities[index] = priorities[parent]
+            positions[items[index]] = index
+            index = parent
+        items[index] = item
+        priorities[index] = priority
+        positions[item] = index
+
+    def sift_down(self, index):
+        """Moves the item at index down while a child has a larger priority"""
+        items = self.items
+        priorities = self.priorities
+        positions = self.positions
+        size = len(items)
+        item = items[index]
+        priority = priorities[index]
+        child = self.arity * index + 1
+        while child < size:
+            last = min(child + self.arity, size)
+            for other in range(child + 1, last):
+                if priorities[other] > priorities[child]:
+                    child = other
+            if priorities[child] <= priority:
+                break
+            items[index] = items[child]
+            priorities[index] = priorities[child]
+            positions[items[index]] = index
+            index = child
+            child = self.arity * index + 1
+        items[index] = item
+        priorities[index] = priority
+        positions[item] = index
+
+    def push(self, item, priority):
+        """Adds item with priority, if item is already in the heap its priority is updated instead"""
+        if item in self.positions:
+            self.update(item, priority)
+            return
+        self.positions[item] = len(self.items)
+        self.items.append(item)
+        self.priorities.append(priority)
+        self.sift_up(len(self.items) - 1)
+
+    def pop(self):
+        """Removes the item with the largest priority and returns (item, priority), None if the heap is empty"""
+        if not self.items:
+            return None
+        result = (self.items[0], self.priorities[0])
+        self.remove_at(0)
+        return result
+
+    def peek(self):
+        """Returns (item, priority) with the largest priority without removing it, None if the heap is empty"""
+        if not self.items:
+            return None
+        return self.items[0], self.priorities[0]
+
+    def priority(self, item):
+        """Returns the priority of item, None if it is not in the heap"""
+        index = self.positions.get(item)
+        if index is None:
+            return None
+        return self.priorities[index]
+
+    def update(self, item, priority):
+        """Changes the priority of item in O(log n), returns False if item is not in the heap"""
+        index = self.positions.get(item)
+        if index is None:
+            return False
+        old = self.priorities[index]
+        self.priorities[index] = priority
+        if old < priority:
+            self.sift_up(index)
+        else:
+            self.sift_down(index)
+        return True
+
+    def decrease_key(self, item, priority):
+        """Lowers the priority of item, returns False if item is not in the heap or priority is larger than its priority"""
+        index = self.positions.get(item)
+        if index is None or self.priorities[index] < priority:
+            return False
+        self.priorities[index] = priority
+        self.sift_down(index)
+        return True
+
+    def remove(self, item):
+        """Removes item in O(log n), returns False if it is not in the heap"""
+        index = self.positions.get(item)
+        if index is None:
+            return False
+        self.remove_at(index)
+        return True
+
+    def remove_at(self, index):
+        """Removes the item at index, the last item takes its place and is moved up or down"""
+        del self.positions[self.items[index]]
+        item = self.items.pop()
+        priority = self.priorities.pop()
+        if index == len(self.items):
+            return
+        old = self.priorities[index]
+        self.items[index] = item
+        self.priorities[index] = priority
+        self.positions[item] = index
+        if old < priority:
+            self.sift_up(index)
+        else:
+            self.sift_down(index)
@@ -1,18 +1,158 @@
 """
 uses quicksort algorithm to sort a list"
+
+The sort is an introsort: quicksort with a median pivot and three way partitioning,
+that switches to insertionsort for small parts and to heapsort if the recursion gets too deep.
+
+quicksort is not stable: elements with equal keys can end up in any order.
 """
+from .heapsort import heapsort, heapsort_items
+from .insertionsort import insertionsort, insertion_kernel
+
+INSERTION_LIMIT = 16 # parts with this many elements or less are sorted by insertionsort
+NINTHER_LIMIT = 128 # parts larger than this use the median of three medians as pivot
+
 
-def quicksort(array, first = 0, pivot = None):
+def quicksort(array, first = 0, pivot = None, key = None, reverse = False, lo = None, hi = None):
     """
-    This function checks if the recursion of quicksort should stop, if not a new partition happens and it calls itself twice.
+    This function sorts array[first..pivot] with introsort.
+    The recursion depth is limited to 2*log2(n), after that the part is sorted with heapsort,
+    which makes the worst case O(n log n).
+    lo and hi sort array[lo:hi] like the other sort functions, key and reverse work like in sorted().
     """
+    if lo is not None:
+        first = lo
+    if hi is not None:
+        pivot = hi - 1
     if pivot is None: #makes sure to sort by the first and last index
         pivot = len(array)-1
 
     if first < pivot: #stops the recursion
-        pivot_index = partition(array, first, pivot)
-        quicksort(array, first, pivot_index-1)
-        quicksort(array, pivot_index+1, pivot)
+        depth_limit = 2 * (pivot - first + 1).bit_length()
+        if key is None:
+            introsort(array, first, pivot, depth_limit)
+        else: #the keys are computed once and sorted, the elements follow their keys
+            items = array[first:pivot + 1]
+            keys = list(map(key, items))
+            introsort_items(keys, items, 0, len(keys) - 1, depth_limit)
+            array[first:pivot + 1] = items
+        if reverse:
+            array[first:pivot + 1] = array[first:pivot + 1][::-1]
+
+
+def introsort(array, first, last, depth_limit):
+    """
+    Sorts array[first..last]. After each partition it only recurses into the smaller part
+    and loops on the larger part, so the stack depth stays O(log n).
+    """
+    while last - first >= INSERTION_LIMIT:
+        if depth_limit == 0:
+            heapsort(array, first, last + 1)
+            return
+        depth_limit -= 1
+        lower, upper = partition3(array, first, last, choose_pivot(array, first, last))
+        if lower - first < last - upper:
+            introsort(array, first, lower - 1, depth_limit)
+            first = upper + 1
+        else:
+            introsort(array, upper + 1, last, depth_limit)
+            last = lower - 1
+    insertionsort(array, first, last + 1)
+
+
+def introsort_items(keys, items, first, last, depth_limit):
+    """introsort for keys[first..last] where items[i] belongs to keys[i] and is moved with it"""
+    while last - first >= INSERTION_LIMIT:
+        if depth_limit == 0:
+            part_keys = keys[first:last + 1]
+            part_items = items[first:last + 1]
+            heapsort_items(part_keys, part_items)
+            keys[first:last + 1] = part_keys
+            items[first:last + 1] = part_items
+            return
+        depth_limit -= 1
+        lower, upper = partition3_items(keys, items, first, last, choose_pivot(keys, first, last))
+        if lower - first < last - upper:
+            introsort_items(keys, items, first, lower - 1, depth_limit)
+            first = upper + 1
+        else:
+            introsort_items(keys, items, upper + 1, last, depth_limit)
+            last = lower - 1
+    insertion_kernel(keys, first, last + 1, items)
+
+
+def median_of_three(array, first, second, third):
+    """Returns the index (first, second or third) that has the median value"""
+    if array[first] < array[second]:
+        if array[second] < array[third]:
+            return second
+        return third if array[first] < array[third] else first
+    if array[first] < array[third]:
+        return first
+    return third if array[second] < array[third] else second
+
+
+def choose_pivot(array, first, last):
+    """
+    Returns a pivot value for array[first..last], the median of the first, middle and last element.
+    Large parts use the ninther, the median of three such medians spread over the part.
+    """
+    middle = (first + last) // 2
+    if last - first > NINTHER_LIMIT:
+        step = (last - first) // 8
+        first = median_of_three(array, first, first + step, first + 2 * step)
+        middle = median_of_three(array, middle - step, middle, middle + step)
+        last = median_of_three(array, last - 2 * step, last - step, last)
+    return array[median_of_three(array, first, middle, last)]
+
+
+def partition3(array, first, last, pivot_value):
+    """
+    Dutch flag partition of array[first..last] around pivot_value.
+    Afterwards the smaller elements are left of lower, the equal ones are in array[lower..upper]
+    and the larger ones are right of upper. Returns (lower, upper).
+    Since the equal elements are never sorted again, lists with many duplicates are fast.
+    """
+    lower = first
+    i = first
+    upper = last
+    while i <= upper:
+        current = array[i]
+        if current < pivot_value:
+            array[i] = array[lower]
+            array[lower] = current
+            lower += 1
+            i += 1
+        elif pivot_value < current:
+            array[i] = array[upper]
+            array[upper] = current
+            upper -= 1
+        else:
+            i += 1
+    return lower, upper
+
+
+def partition3_items(keys, items, first, last, pivot_value):
+    """partition3 for keys where items[i] belongs to keys[i] and is moved with it"""
+    lower = first
+    i = first
+    upper = last
+    while i <= upper:
+        current = keys[i]
+        if current < pivot_value:
+            keys[i] = keys[lower]
+            keys[lower] = current
+            items[i], items[lower] = items[lower], items[i]
+            lower += 1
+            i += 1
+        elif pivot_value < current:
+            keys[i] = keys[upper]
+            keys[upper] = current
+            items[i], items[upper] = items[upper], items[i]
+            upper -= 1
+        else:
+            i += 1
+    return lower, upper
 
 
 def partition(array, start, pivot):
@@ -27,6 +167,6 @@ def partition(array, start, pivot):
         if current <= pivot_value:
             i += 1
             array[i], array[j] = array[j], array[i]
-   
+
     array[pivot], array[i+1] = array[i+1], array[pivot]
     return i + 1
@@ -0,0 +1,37 @@
+"""
+This module sorts a list of integers with LSD radix sort
+
+The values are sorted digit by digit, starting with the lowest digit. A digit is 8 bits (or 11 bits) of the value,
+each pass puts the values in one bucket per digit value and joins the buckets again, which keeps the order of the
+previous passes. The time is O(n * number of digits), no values are compared.
+Negative values are handled by sorting value - min(values). The sort is stable.
+"""
+from itertools import chain
+
+DIGIT_BITS = 8 # bits per digit, 11 bits makes fewer passes over more buckets
+
+def radixsort(array, lo=0, hi=None, digit_bits=DIGIT_BITS):
+    """Sorts the integers in array[lo:hi] in place with LSD radix sort and returns array"""
+    if hi is None:
+        hi = len(array)
+    if hi - lo < 2:
+        return array
+    part = array[lo:hi]
+    minimum = min(part)
+    span = max(part) - minimum
+    mask = (1 << digit_bits) - 1
+    if minimum:
+        part = [value - minimum for value in part]
+    for shift in range(0, span.bit_length(), digit_bits):
+        buckets = [[] for _ in range(mask + 1)]
+        for value in part:
+            buckets[(value >> shift) & mask].append(value)
+        part = list(chain.from_iterable(buckets))
+    if minimum:
+        part = [value + minimum for value in part]
+    if isinstance(array, list):
+        array[lo:hi] = part
+    else: #array.array and memoryview only take slices of their own type
+        for i, value in enumerate(part, lo):
+            array[i] = value
+    return array
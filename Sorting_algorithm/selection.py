@@ -0,0 +1,147 @@
+"""
+Finds the smallest or largest elements of a list without sorting all of it.
+
+nth_element puts the element that belongs at index k in its place (quickselect),
+partial_sort sorts only the k smallest elements and top_k takes the k largest (or smallest)
+elements of any iterable, also a generator, with a heap that never holds more than k elements.
+"""
+from .heapsort import heapsort, heapsort_items, heapify_items
+from .insertionsort import insertion_kernel
+from .quicksort import INSERTION_LIMIT, choose_pivot, introsort, introsort_items, partition3, partition3_items
+
+
+class Reversed:
+    """Wraps a key so that it compares the other way, this turns the max heap of heapsort into a min heap"""
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+    def __gt__(self, other):
+        return self.value < other.value
+
+    def __le__(self, other):
+        return not self.value < other.value
+
+    def __ge__(self, other):
+        return not other.value < self.value
+
+
+def introselect(keys, k, first, last, depth_limit, items=None):
+    """
+    Quickselect on keys[first..last]: partitions around a pivot and only goes on in the part that holds index k.
+    Afterwards keys[k] has its sorted value, the keys left of it are not larger and the keys right of it not smaller.
+    If the depth limit is reached the part is heapsorted, so the worst case is O(n log n), the expected time is O(n).
+    If items is given its elements are moved the same way as keys.
+    """
+    while last - first >= INSERTION_LIMIT:
+        if depth_limit == 0:
+            if items is None:
+                heapsort(keys, first, last + 1)
+            else:
+                part_keys = keys[first:last + 1]
+                part_items = items[first:last + 1]
+                heapsort_items(part_keys, part_items)
+                keys[first:last + 1] = part_keys
+                items[first:last + 1] = part_items
+            return
+        depth_limit -= 1
+        pivot_value = choose_pivot(keys, first, last)
+        if items is None:
+            lower, upper = partition3(keys, first, last, pivot_value)
+        else:
+            lower, upper = partition3_items(keys, items, first, last, pivot_value)
+        if k < lower:
+            last = lower - 1
+        elif k > upper:
+            first = upper + 1
+        else: #k is among the elements equal to the pivot, they are all in place
+            return
+    insertion_kernel(keys, first, last + 1, items)
+
+
+def nth_element(array, k, lo=0, hi=None, key=None):
+    """
+    Rearranges array[lo:hi] so that array[k] is the element that would be there if it was sorted,
+    with no larger element before it and no smaller element after it. Returns array[k],
+    or None if k is not in lo..hi-1. The median of a list is nth_element(array, len(array) // 2).
+    key works like in sorted(), each key is computed once.
+    """
+    if hi is None:
+        hi = len(array)
+    if not lo <= k < hi:
+        return None
+    depth_limit = 2 * (hi - lo).bit_length()
+    if key is None:
+        introselect(array, k, lo, hi - 1, depth_limit)
+    else: #the keys are computed once and selected, the elements follow their keys
+        items = array[lo:hi]
+        introselect(list(map(key, items)), k - lo, 0, hi - lo - 1, depth_limit, items)
+        array[lo:hi] = items
+    return array[k]
+
+
+def partial_sort(array, k, lo=0, hi=None, key=None):
+    """
+    Puts the k smallest elements of array[lo:hi] sorted in array[lo:lo+k], the rest of the part
+    follows in no particular order. Takes O(n + k log k) instead of O(n log n) for a full sort.
+    key works like in sorted(). Returns array.
+    """
+    if hi is None:
+        hi = len(array)
+    k = min(k, hi - lo)
+    if k <= 0:
+        return array
+    depth_limit = 2 * (hi - lo).bit_length()
+    if key is None:
+        introselect(array, lo + k - 1, lo, hi - 1, depth_limit)
+        introsort(array, lo, lo + k - 1, depth_limit)
+    else:
+        items = array[lo:hi]
+        keys = list(map(key, items))
+        introselect(keys, k - 1, 0, hi - lo - 1, depth_limit, items)
+        introsort_items(keys, items, 0, k - 1, depth_limit)
+        array[lo:hi] = items
+    return array
+
+
+def top_k(iterable, k, key=None, largest=True):
+    """
+    Returns a list of the k largest elements of iterable, largest first, or the k smallest
+    (smallest first) if largest is False. iterable is read once, so it can be a generator,
+    and only k elements are kept at a time: they are in a heap whose root is the worst kept element,
+    a new element replaces the root if it is better. Takes O(n log k) time and O(k) memory.
+    Elements with equal keys can come in any order.
+    """
+    if k <= 0:
+        return []
+    keys = []
+    items = []
+    iterator = iter(iterable)
+    for item in iterator:
+        value = item if key is None else key(item)
+        keys.append(Reversed(value) if largest else value)
+        items.append(item)
+        if len(keys) == k:
+            break
+    size = len(keys)
+    for i in range((size - 2) // 2, -1, -1):
+        heapify_items(keys, items, size, i)
+    if size == k:
+        for item in iterator:
+            value = item if key is None else key(item)
+            if largest:
+                if not keys[0].value < value:
+                    continue
+                keys[0] = Reversed(value)
+            else:
+                if not value < keys[0]:
+                    continue
+                keys[0] = value
+            items[0] = item
+            heapify_items(keys, items, k, 0)
+    heapsort_items(keys, items)
+    return items
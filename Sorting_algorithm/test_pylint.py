@@ -1,9 +1,10 @@
-from heapsort import heapsort
-from insertionsort import insertionsort
-from quicksort import quicksort
+from .heapsort import heapsort
+from .insertionsort import insertionsort
+from .quicksort import quicksort
+import os
 import pylint.lint
 
 func_list = ["heapsort","insertionsort","quicksort"]
 opt = int(input("Choose, 0 - 2: "))
-pylint_opts = ['--disable=line-too-long', func_list[opt]]
+pylint_opts = ['--disable=line-too-long', os.path.join(os.path.dirname(os.path.abspath(__file__)), func_list[opt] + '.py')]
 pylint.lint.Run(pylint_opts)
@@ -1,16 +1,21 @@
 """
 Written by Carina Nilsson, February 2021, cnl@bth.se
+
+Run from the repository root with: python -m Sorting_algorithm.test_sort
 """
 import sys
 import os
 import time
 import logging
-import pylint.lint
+from array import array
 import numpy as np
 
-from heapsort import heapsort
-from quicksort import quicksort
-from insertionsort import insertionsort
+from .heapsort import heapsort
+from .quicksort import quicksort
+from .insertionsort import insertionsort
+from .mergesort import mergesort
+from .dispatch import sort
+from .numpy_sort import countingsort_numpy, radixsort_numpy
 
 # check if Python version is valid for this script
 if sys.version < '3.7':
@@ -22,6 +27,8 @@ if sys.version < '3.7':
 NEWLINE = '\n'
 LINT_THRESHOLD = 8.0
 FUNC_LIST = ['insertionsort', 'quicksort', 'heapsort']
+STABLE_FUNCS = [sorted, insertionsort, mergesort] # sort functions that keep the order of equal keys
+INTEGER_FUNCS = [countingsort_numpy, radixsort_numpy, sort] # sort functions for NumPy integer arrays
 LOG_LEVEL = 'INFO'  # Also DEBUG, INFO, WARNING, ...
 
 # Small data sets
@@ -105,8 +112,54 @@ def check_sorting(sortfunc):
     return True
 
 
+def check_array(sortfunc):
+    """Checks sorting of an array.array, long enough that the merges of mergesort are used"""
+    input_list = np.random.randint(-1000, 1000, size=200).tolist()
+    input_array = array('q', input_list)
+    result = sortfunc(input_array)
+    if result is None:
+        sorted_list = list(input_array)
+    else:
+        sorted_list = list(result)
+    return sorted_list == sorted(input_list)
+
+
+def check_key_reverse(sortfunc):
+    """Checks that key and reverse sort like sorted() does, and that stable functions keep equal keys in order"""
+    input_list = [(value, i) for i, value in enumerate(np.random.randint(-10, 10, size=50).tolist())]
+    expected = sorted(input_list, key=lambda item: abs(item[0]), reverse=True)
+    result = sortfunc(input_list, key=lambda item: abs(item[0]), reverse=True)
+    if result is None:
+        sorted_list = input_list
+    else:
+        sorted_list = result
+    if [abs(item[0]) for item in sorted_list] != [abs(item[0]) for item in expected]:
+        return False
+    if sortfunc in STABLE_FUNCS and sorted_list != expected:
+        return False
+    return sorted(sorted_list) == sorted(expected)
+
+
+def check_integer_dtypes(sortfunc):
+    """Checks NumPy integer arrays where value - min overflows the dtype: int8, uint64 near 2**64 and negative values"""
+    arrays = [np.random.randint(-128, 128, size=1000).astype(np.int8),
+              np.uint64(2**64 - 1000) + np.arange(100, dtype=np.uint64)[::-1],
+              np.random.randint(-1000, 1000, size=1000)]
+    for array in arrays:
+        expected = np.sort(array)
+        result = sortfunc(array)
+        if result is None:
+            sorted_array = array
+        else:
+            sorted_array = np.asarray(result)
+        if sorted_array.dtype != expected.dtype or not (sorted_array == expected).all():
+            return False
+    return True
+
+
 def test_code_quality():
     """Checks pylint score against LINT_THRESHOLD"""
+    import pylint.lint # only needed here, pylint is slow to import
     print('\nChecking code quality by pylint score, 8.0 is minimum to pass\n')
     log.info('\nChecking code quality by pylint score, 8.0 is minimum to pass')
     stdout = sys.stdout
@@ -114,7 +167,7 @@ def test_code_quality():
     for func in FUNC_LIST:
         sys.stdout = outfile
         run = pylint.lint.Run(
-            [func + '.py'], do_exit=False)
+            [os.path.join(os.path.dirname(os.path.abspath(__file__)), func + '.py')], do_exit=False)
         print(run.linter.stats)
         """score = run.linter.stats['global_note']
         if score < LINT_THRESHOLD:
@@ -153,12 +206,38 @@ def test_sorting(functions, sortfunc_names):
             print('Failed list with length 1: ' + sortfunc_names[i])
             sys.exit(1)
         if check_sorting(func):
-            log.info('Correct sorting: ' + sortfunc_names[i] + '\n')
-            print('Correct sorting: ' + sortfunc_names[i] + '\n')
+            log.info('Correct sorting: ' + sortfunc_names[i])
+            print('Correct sorting: ' + sortfunc_names[i])
         else:
             log.info('Failed sorting: ' + sortfunc_names[i])
             print('Failed sorting: ' + sortfunc_names[i])
             sys.exit(1)
+        if check_array(func):
+            log.info('Correct array.array sorting: ' + sortfunc_names[i])
+            print('Correct array.array sorting: ' + sortfunc_names[i])
+        else:
+            log.info('Failed array.array sorting: ' + sortfunc_names[i])
+            print('Failed array.array sorting: ' + sortfunc_names[i])
+            sys.exit(1)
+        if check_key_reverse(func):
+            log.info('Correct key and reverse: ' + sortfunc_names[i] + '\n')
+            print('Correct key and reverse: ' + sortfunc_names[i] + '\n')
+        else:
+            log.info('Failed key and reverse: ' + sortfunc_names[i])
+            print('Failed key and reverse: ' + sortfunc_names[i])
+            sys.exit(1)
+
+
+def test_integer_sorting():
+    """Calls the integer dtype test for the integer sort functions"""
+    for func in INTEGER_FUNCS:
+        if check_integer_dtypes(func):
+            log.info('Correct integer dtypes: ' + func.__name__)
+            print('Correct integer dtypes: ' + func.__name__)
+        else:
+            log.info('Failed integer dtypes: ' + func.__name__)
+            print('Failed integer dtypes: ' + func.__name__)
+            sys.exit(1)
 
 
 def test_performance(functions, sortfunc_names):
@@ -214,6 +293,7 @@ def create_report(sortfunc_list):
         sortfunc_names.append(func.__name__)
     check_functions()
     test_sorting(sortfunc_list, sortfunc_names)
+    test_integer_sorting()
     test_performance(sortfunc_list, sortfunc_names)
     test_code_quality()
     print('\nAll tests passed successfully!')
@@ -227,6 +307,5 @@ if __name__ == '__main__':
                         filemode='w',
                         format='\n%(levelname)-4s [L:%(lineno)d] %(message)s',
                         datefmt='%Y-%m-%d:%H:%M:%S')
-    sys.setrecursionlimit(10000)
-    func_list = [sorted, quicksort, heapsort, insertionsort]
+    func_list = [sorted, quicksort, heapsort, insertionsort, mergesort]
     create_report(func_list)
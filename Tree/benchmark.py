@@ -0,0 +1,101 @@
+"""
+Times the red black tree operations, run with: python benchmark.py [number of values]
+The concurrent tree is stress tested with: python benchmark.py [number of values] concurrent
+"""
+import random
+import sys
+import threading
+import time
+
+from concurrent_tree import ConcurrentRedBlackTree
+from red_black_tree import RedBlackTree
+
+SIZE = 1000000
+SEED = 2021
+READER_COUNTS = [1, 2, 4, 8]
+DURATION = 2.0
+
+
+def time_operation(name, values, operation):
+    """Runs operation once for every value and prints the total and per operation time"""
+    timestamp_before = time.perf_counter()
+    for value in values:
+        operation(value)
+    sec = time.perf_counter() - timestamp_before
+    print(f'{name:30} {sec:10.4f} s {sec / len(values) * 1e6:10.3f} us/op')
+
+
+def run(size):
+    """Times insert, search and remove for random and sequential values"""
+    random_values = list(range(size))
+    random.Random(SEED).shuffle(random_values)
+    sequential_values = list(range(size))
+    print(f'{"Operation":30} {"Total":>12} {"Per operation":>16}')
+    print('-' * 60)
+    for kind, values in (('random', random_values), ('sequential', sequential_values)):
+        tree = RedBlackTree()
+        time_operation(f'insert {size} {kind}', values, tree.insert)
+        time_operation(f'search {size} {kind}', values, tree.search)
+        time_operation(f'remove {size} {kind}', values, tree.remove)
+
+
+def reader(tree, size, stop, counts, errors, seed):
+    """
+    Looks up the even values, which are never removed, until stop is set.
+    Every lookup must find them, otherwise the reader saw a broken tree.
+    """
+    rand = random.Random(seed)
+    operations = 0
+    while not stop.is_set():
+        value = rand.randrange(size) * 2
+        window = tree.irange(value, value + 8)
+        if not tree.search(value) or tree.path(value)[-1] != value or window[0] != value or window != sorted(window):
+            errors.append(value)
+        operations += 1
+    counts.append(operations)
+
+
+def writer(tree, size, stop, counts, seed):
+    """Inserts and removes odd values until stop is set"""
+    rand = random.Random(seed)
+    operations = 0
+    while not stop.is_set():
+        value = rand.randrange(size) * 2 + 1
+        if rand.random() < 0.5:
+            tree.insert(value)
+        else:
+            tree.remove(value)
+        operations += 1
+    counts.append(operations)
+
+
+def run_concurrent(size):
+    """Runs one writer against a growing number of readers and prints the throughput"""
+    tree = ConcurrentRedBlackTree(RedBlackTree.from_iterable(range(0, size * 2, 2), presorted=True))
+    print(f'{"Readers":10} {"Reads/s":>12} {"Writes/s":>12} {"Errors":>8}')
+    print('-' * 45)
+    for reader_count in READER_COUNTS:
+        stop = threading.Event()
+        read_counts = []
+        write_counts = []
+        errors = []
+        threads = [threading.Thread(target=writer, args=(tree, size, stop, write_counts, SEED))]
+        for i in range(reader_count):
+            threads.append(threading.Thread(target=reader, args=(tree, size, stop, read_counts, errors, SEED + i)))
+        for thread in threads:
+            thread.start()
+        time.sleep(DURATION)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        print(f'{reader_count:<10} {sum(read_counts) / DURATION:12.0f} {sum(write_counts) / DURATION:12.0f} {len(errors):8}')
+        if errors:
+            print('Test failed! A reader did not find a value that was never removed')
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2 and sys.argv[2] == 'concurrent':
+        run_concurrent(int(sys.argv[1]))
+    else:
+        run(int(sys.argv[1]) if len(sys.argv) > 1 else SIZE)
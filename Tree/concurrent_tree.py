@@ -0,0 +1,150 @@
+"""A red black tree that can be shared between threads"""
+import threading
+from contextlib import contextmanager
+
+from red_black_tree import RedBlackTree
+
+
+class ReadWriteLock:
+    """
+    Lets many readers hold the lock at the same time, or a single writer.
+    A waiting writer stops new readers from entering so writes are not starved.
+    """
+    def __init__(self):
+        """The lock starts free"""
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        """Waits until no writer holds or waits for the lock, then enters as a reader"""
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        """Leaves as a reader, the last reader wakes up waiting writers"""
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        """Waits until there are no readers and no writer, then enters as the writer"""
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+
+    def release_write(self):
+        """Leaves as the writer and wakes up everyone waiting"""
+        with self._condition:
+            self._writing = False
+            self._condition.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        """Holds the lock as a reader in a with statement"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        """Holds the lock as the writer in a with statement"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentRedBlackTree:
+    """
+    Wraps a red black tree with a readers-writer lock.
+    Lookups run in parallel with each other, insert and remove run alone,
+    so a reader never sees a tree in the middle of a rotation.
+    """
+    def __init__(self, tree=None):
+        """Wraps tree, or a new empty red black tree"""
+        self.tree = RedBlackTree() if tree is None else tree
+        self.lock = ReadWriteLock()
+
+    def search(self, value):
+        """Returns true if value is in the tree"""
+        with self.lock.read_locked():
+            return self.tree.search(value)
+
+    def contains_many(self, values):
+        """Returns a list of bools telling if each value is in the tree"""
+        with self.lock.read_locked():
+            return self.tree.contains_many(values)
+
+    def path(self, value):
+        """Returns the values from the root to value, see RedBlackTree.path"""
+        with self.lock.read_locked():
+            return self.tree.path(value)
+
+    def min(self):
+        """Returns the smallest value"""
+        with self.lock.read_locked():
+            return self.tree.min()
+
+    def max(self):
+        """Returns the largest value"""
+        with self.lock.read_locked():
+            return self.tree.max()
+
+    def stats(self):
+        """Returns the node count and black height of the tree, see RedBlackTree.stats"""
+        with self.lock.read_locked():
+            return self.tree.stats()
+
+    def floor(self, value):
+        """Returns the largest value <= value, None if there is none"""
+        with self.lock.read_locked():
+            return self.tree.floor(value)
+
+    def ceiling(self, value):
+        """Returns the smallest value >= value, None if there is none"""
+        with self.lock.read_locked():
+            return self.tree.ceiling(value)
+
+    def irange(self, low=None, high=None, inclusive=(True, True), reverse=False):
+        """
+        Returns a list of the values between low and high, see RedBlackTree.irange.
+        The values are collected while the read lock is held so a writer can not change them halfway.
+        """
+        with self.lock.read_locked():
+            return list(self.tree.irange(low, high, inclusive, reverse))
+
+    def __iter__(self):
+        """Iterates over a sorted list of the values taken under the read lock"""
+        with self.lock.read_locked():
+            return iter(list(self.tree))
+
+    def insert(self, value):
+        """Inserts value while holding the write lock"""
+        with self.lock.write_locked():
+            self.tree.insert(value)
+
+    def remove(self, value):
+        """Removes value while holding the write lock"""
+        with self.lock.write_locked():
+            self.tree.remove(value)
+
+    def insert_many(self, values):
+        """Inserts a batch of values while holding the write lock"""
+        with self.lock.write_locked():
+            self.tree.insert_many(values)
+
+    def remove_many(self, values):
+        """Removes a batch of values while holding the write lock"""
+        with self.lock.write_locked():
+            self.tree.remove_many(values)
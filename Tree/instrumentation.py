@@ -0,0 +1,186 @@
+"""
+Opt-in statistics for the red black trees: rotations, recolorings and the time spent in the fixups
+of every insert and remove.
+
+    sink = MemorySink()
+    with instrumented(tree, sink):
+        tree.insert(5)
+    sink.records[-1] # {"operation": "insert", "rotations": ..., "recolorings": ..., "fixups": {...}}
+
+Nothing changes in the tree classes: inside the with block the operations, rotations and fixups of this
+tree object are replaced by counting wrappers and its nodes get a subclass of their class that
+counts color changes. Afterwards the tree is put back as it was, so a tree that is not instrumented
+has no overhead. A ConcurrentRedBlackTree is instrumented through its tree attribute.
+Not thread safe: only one instrumented tree may be used at a time.
+
+The sinks are the same classes as in Sorting_algorithm/instrumentation.py, any object with a record(stats)
+method can be a sink. They are kept in both files because the two folders are separate: the tree modules
+are run from the Tree folder with plain imports, so the Sorting_algorithm package is not importable here.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from red_black_tree import Node
+
+OPERATIONS = ["insert", "remove", "insert_many", "remove_many"]
+FIXUPS = ["insert_fixup", "remove_fixup"]
+ROTATIONS = ["left_rotate", "right_rotate"]
+RED_SLOT = Node.__dict__["_red"] # the slot that stores the color, used by the counting nodes
+
+
+class Counter:
+    """The statistics of the running operation"""
+    active = False
+    rotations = 0
+    recolorings = 0
+    fixups = {}
+
+
+class MemorySink:
+    """Keeps the records in a list"""
+    def __init__(self):
+        self.records = []
+
+    def record(self, stats):
+        """Adds the statistics of one operation"""
+        self.records.append(stats)
+
+
+class LoggingSink:
+    """Logs every record on one line"""
+    def __init__(self, logger=None, level=logging.INFO):
+        self.logger = logger or logging.getLogger(__name__)
+        self.level = level
+
+    def record(self, stats):
+        """Logs the statistics of one operation"""
+        self.logger.log(self.level, "%s", json.dumps(stats))
+
+
+class JsonSink:
+    """Appends every record to a file as one line of JSON"""
+    def __init__(self, path):
+        self.path = path
+
+    def record(self, stats):
+        """Writes the statistics of one operation"""
+        with open(self.path, "a") as file:
+            file.write(json.dumps(stats) + "\n")
+
+
+def get_red(node):
+    """Reads the color slot"""
+    return RED_SLOT.__get__(node)
+
+
+def set_red(node, red):
+    """Writes the color slot and counts it as a recoloring if the color changes"""
+    try:
+        if RED_SLOT.__get__(node) != red:
+            Counter.recolorings += 1
+    except AttributeError: #a new node gets its first color, that is not a recoloring
+        pass
+    RED_SLOT.__set__(node, red)
+
+
+COUNTING_CLASSES = {}
+
+
+def counting_class(node_class):
+    """Returns a subclass of node_class whose color writes are counted, it has the same slots so nodes can switch class"""
+    if node_class not in COUNTING_CLASSES:
+        COUNTING_CLASSES[node_class] = type("Counting" + node_class.__name__, (node_class,),
+                                            {"__slots__": (), "_red": property(get_red, set_red)})
+    return COUNTING_CLASSES[node_class]
+
+
+def set_node_classes(tree, node_class):
+    """Gives the nil node and every node of tree the class node_class"""
+    tree.nil.__class__ = node_class
+    nodes = [tree.root]
+    while nodes:
+        node = nodes.pop()
+        if node is not tree.nil:
+            node.__class__ = node_class
+            nodes.append(node._left)
+            nodes.append(node._right)
+
+
+def counted(original):
+    """Returns the rotation original wrapped so that it is counted"""
+    @wraps(original)
+    def wrapper(node):
+        Counter.rotations += 1
+        return original(node)
+    return wrapper
+
+
+def timed(original, name):
+    """
+    Returns the fixup original wrapped so that its calls and time are added to Counter.fixups[name],
+    only while a recorded operation runs
+    """
+    @wraps(original)
+    def wrapper(node):
+        if not Counter.active:
+            return original(node)
+        start = time.perf_counter()
+        try:
+            return original(node)
+        finally:
+            fixup = Counter.fixups.setdefault(name, {"calls": 0, "seconds": 0.0})
+            fixup["calls"] += 1
+            fixup["seconds"] += time.perf_counter() - start
+    return wrapper
+
+
+def recorded(original, name, sink):
+    """Returns the operation original wrapped so that its statistics are sent to sink, calls inside it are part of it"""
+    @wraps(original)
+    def wrapper(*args, **kwargs):
+        if Counter.active:
+            return original(*args, **kwargs)
+        Counter.active = True
+        Counter.rotations = 0
+        Counter.recolorings = 0
+        Counter.fixups = {}
+        start = time.perf_counter()
+        try:
+            return original(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            Counter.active = False
+            sink.record({"operation": name, "seconds": seconds, "rotations": Counter.rotations,
+                         "recolorings": Counter.recolorings,
+                         "fixups": {name: dict(fixup) for name, fixup in Counter.fixups.items()}})
+    return wrapper
+
+
+@contextmanager
+def instrumented(tree, sink=None, operations=None):
+    """
+    Instruments tree inside the with block, every call of one of the operations (names of tree methods,
+    OPERATIONS if None) sends a dict to sink: operation, seconds, rotations, recolorings and
+    fixups (calls and seconds of insert_fixup and remove_fixup). Returns sink, a MemorySink if None.
+    """
+    sink = sink if sink is not None else MemorySink()
+    node_class = type(tree.nil)
+    counting = counting_class(node_class)
+    set_node_classes(tree, counting)
+    tree.new_node = counting
+    for name in ROTATIONS:
+        setattr(tree, name, counted(getattr(tree, name)))
+    for name in FIXUPS:
+        setattr(tree, name, timed(getattr(tree, name), name))
+    names = OPERATIONS if operations is None else operations
+    for name in names:
+        setattr(tree, name, recorded(getattr(tree, name), name, sink))
+    try:
+        yield sink
+    finally:
+        for name in ["new_node"] + ROTATIONS + FIXUPS + list(names):
+            del tree.__dict__[name]
+        set_node_classes(tree, node_class)
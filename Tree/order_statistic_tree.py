@@ -0,0 +1,148 @@
+"""This is a red black tree that also keeps the size of every subtree"""
+from red_black_tree import Node, RedBlackTree
+
+
+class SizedNode(Node):
+    """
+    A node that also knows how many nodes there are in its subtree
+    size - int, the nil node has size 0
+    """
+    __slots__ = ("_size",)
+
+    def __init__(self, value):
+        """A new node is a leaf, so its subtree only holds itself"""
+        super().__init__(value)
+        self._size = 1
+
+    def size(self):
+        """returns the number of nodes in the subtree of a node"""
+        return self._size
+
+    def set_size(self, size):
+        """sets the subtree size of a node"""
+        self._size = size
+
+
+class OrderStatisticTree(RedBlackTree):
+    """
+    A red black tree where each node stores its subtree size.
+    The sizes are kept up to date by insert, remove and the rotations,
+    which makes rank, select and count_range run in O(log n).
+    """
+    def __init__(self):
+        """Same as a red black tree, but the nil node has size 0"""
+        super().__init__()
+        self.nil.set_size(0)
+
+    @staticmethod
+    def new_node(value):
+        """Creates a node that stores its subtree size"""
+        return SizedNode(value)
+
+    def __len__(self):
+        """returns the number of values in the tree"""
+        return self.root.size()
+
+    def build(self, keys, first, last, parent, depth, red_depth):
+        """Builds a balanced subtree like the red black tree does and sets its size"""
+        node = super().build(keys, first, last, parent, depth, red_depth)
+        if node != self.nil:
+            node.set_size(last - first + 1)
+        return node
+
+    def left_rotate(self, node):
+        """left rotates with node as a pivot, the child takes over the size of node"""
+        child = node.right()
+        super().left_rotate(node)
+        child.set_size(node.size())
+        node.set_size(node.left().size() + node.right().size() + 1)
+
+    def right_rotate(self, node):
+        """right rotates with node as a pivot, the child takes over the size of node"""
+        child = node.left()
+        super().right_rotate(node)
+        child.set_size(node.size())
+        node.set_size(node.left().size() + node.right().size() + 1)
+
+    def refresh(self, node):
+        """The size of a node is the size of its children plus itself, join calls this bottom up"""
+        node.set_size(node.left().size() + node.right().size() + 1)
+
+    def drop_subtree(self, node):
+        """Counts a removed subtree with its size, O(1) so remove_range stays O(log n)"""
+        self.length -= node.size()
+
+    def moved(self, right):
+        """Counts the nodes that split moved to right with the size of its root, O(1)"""
+        right.length = right.root.size()
+        self.length -= right.length
+
+    def insert_fixup(self, node):
+        """
+        insert links the new leaf and then calls this function,
+        so every ancestor of the leaf is counted before the tree gets fixed
+        """
+        parent = node.parent()
+        while parent != self.nil:
+            parent.set_size(parent.size() + 1)
+            parent = parent.parent()
+        super().insert_fixup(node)
+
+    def remove_node(self, node):
+        """
+        The node that leaves its place is node itself or its successor (tracker),
+        every ancestor of that place loses one from its size before the node is removed.
+        If the successor moves up it takes over the size of node.
+        """
+        if node.left() == self.nil or node.right() == self.nil:
+            tracker = node
+        else:
+            tracker = self.subtree_min(node.right())
+        parent = tracker.parent()
+        while parent != self.nil:
+            parent.set_size(parent.size() - 1)
+            parent = parent.parent()
+        if tracker != node:
+            tracker.set_size(node.size())
+        super().remove_node(node)
+
+    def rank(self, value):
+        """Returns how many values in the tree are smaller than value"""
+        return self.count_below(value, False)
+
+    def count_below(self, value, inclusive):
+        """Counts the values smaller than value, or smaller or equal if inclusive is True"""
+        count = 0
+        node = self.root
+        while node != self.nil:
+            if value < node.value() or (value == node.value() and not inclusive):
+                node = node.left()
+            else:
+                count += node.left().size() + 1
+                node = node.right()
+        return count
+
+    def select(self, index):
+        """
+        Returns the value at position index (0 is the smallest) in sorted order,
+        if the index is outside the tree it returns None
+        """
+        if index < 0 or index >= self.root.size():
+            return None
+        node = self.root
+        while node != self.nil:
+            left_size = node.left().size()
+            if index == left_size:
+                return node.value()
+            if index < left_size:
+                node = node.left()
+            else:
+                index -= left_size + 1
+                node = node.right()
+        return None
+
+    def count_range(self, low, high):
+        """Returns how many values v in the tree there are with low <= v <= high"""
+        if high < low:
+            return 0
+        return self.count_below(high, True) - self.count_below(low, False)
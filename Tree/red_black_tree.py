@@ -1,4 +1,16 @@
 """This is a red black tree structure"""
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from mmap import mmap as MemoryMap, ACCESS_READ
+
+# Snapshot files start with a header: magic, format version, array typecode and the number of values
+SNAPSHOT_MAGIC = b"RBTS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<4sBc2xQ")
+
+
 class Node:
     """
     Each node has 5 attributes
@@ -6,8 +18,13 @@ class Node:
     left - a node
     right - a node
     parent - a node
-    color - "BLACK"/"RED"
+    color - "BLACK"/"RED", stored as a bool (_red) to keep nodes small
+
+    The attributes live in __slots__ so a node has no __dict__,
+    which keeps the memory per key low in large trees.
     """
+    __slots__ = ("_value", "_left", "_right", "_parent", "_red")
+
     def __init__(self, value):
         """
         All nodes are created with a value and the color RED.
@@ -17,7 +34,7 @@ class Node:
         self._left = None
         self._right = None
         self._parent = None
-        self._color = "RED"
+        self._red = True
 
     def set_left(self, node):
         """
@@ -40,7 +57,7 @@ class Node:
 
     def change_color(self, color):
         """take a string "color" and changes nodes color to it"""
-        self._color = color
+        self._red = color == "RED"
 
     def value(self):
         """returns the value of a node"""
@@ -48,7 +65,7 @@ class Node:
 
     def color(self):
         """returns the color of the node"""
-        return self._color
+        return "RED" if self._red else "BLACK"
 
     def right(self):
         """returns the right child of a node"""
@@ -65,269 +82,970 @@ class Node:
 
 class RedBlackTree:
     """A red black tree"""
+    # The tree reads and writes the node slots directly instead of through the Node methods,
+    # a method call per step costs too much in the loops of search, insert, remove and the fixups.
+    # pylint: disable=protected-access
     def __init__(self):
-        """The tree starts empty with a nil node, aslo sets the root to the nil node"""
-        self.nil = Node(None)
+        """
+        The tree starts empty with a nil node, aslo sets the root to the nil node.
+        Next to the root the tree keeps some numbers up to date on every change, so they can be read in O(1):
+        length - the number of nodes, only right if length_known is True
+        length_known - False after split or remove_range moved out subtrees of unknown size,
+        len() counts the nodes again then
+        min_node, max_node - the nodes with the smallest and the largest value, nil if the tree is empty
+        root_black_height - the number of black nodes on every path from the root down to nil
+        tree_height - the height found by the last stats call, None if the tree changed since then
+        """
+        self.nil = self.new_node(None)
         self.nil.change_color("BLACK")
         self.root = self.nil
+        self.length = 0
+        self.length_known = True
+        self.min_node = self.nil
+        self.max_node = self.nil
+        self.root_black_height = 0
+        self.tree_height = 0
+
+    @staticmethod
+    def new_node(value):
+        """Creates the node used by the tree, subclasses override this to use another node type"""
+        return Node(value)
+
+    @classmethod
+    def from_iterable(cls, values, presorted=False):
+        """
+        Builds a tree from many values at once, faster than calling insert for each value.
+        The values are sorted and duplicates removed (if presorted is True they are only deduped),
+        then a balanced tree is built in linear time without any rotations.
+        Every level is black except the deepest one, which is red if it is not full.
+        """
+        if presorted:
+            keys = []
+            for value in values:
+                if not keys or keys[-1] != value:
+                    keys.append(value)
+        else:
+            keys = sorted(set(values))
+        tree = cls()
+        size = len(keys)
+        red_depth = -1
+        if size & (size + 1):
+            red_depth = size.bit_length() - 1
+        root = tree.build(keys, 0, size - 1, tree.nil, 0, red_depth)
+        tree.set_root(root, tree.black_height(root))
+        tree.length = size
+        return tree
+
+    def build(self, keys, first, last, parent, depth, red_depth):
+        """Links keys[first..last] into a balanced subtree and returns its root"""
+        if first > last:
+            return self.nil
+        middle = (first + last) // 2
+        node = self.new_node(keys[middle])
+        node.set_parent(parent)
+        node.change_color("RED" if depth == red_depth else "BLACK")
+        node.set_left(self.build(keys, first, middle - 1, node, depth + 1, red_depth))
+        node.set_right(self.build(keys, middle + 1, last, node, depth + 1, red_depth))
+        return node
 
     def subtree_min(self, node):
         """Returns the smallest node in a nodes subtree"""
-        while node.left() != self.nil or None:
-            node = node.left()
+        nil = self.nil
+        while node._left is not nil:
+            node = node._left
         return node
 
     def min(self):
-        """Uses subtree_min to find the smallest node in the roots subtree"""
-        node = self.subtree_min(self.root)
-        return node.value()
+        """Returns the smallest value, None if the tree is empty. The node is cached, so this is O(1)"""
+        return self.min_node._value
 
     def subtree_max(self, node):
         """Returns the largest node in a nodes subtree"""
-        while node.right() != self.nil:
-            node = node.right()
+        nil = self.nil
+        while node._right is not nil:
+            node = node._right
         return node
 
     def max(self):
-        """Uses subtree_max to finds the largest node in the roots subtree"""
-        node = self.subtree_max(self.root)
-        return node.value()
+        """Returns the largest value, None if the tree is empty. The node is cached, so this is O(1)"""
+        return self.max_node._value
+
+    def node_count(self):
+        """
+        Returns the number of nodes, O(1). split, remove_range, intersection and difference do not count
+        the nodes they move or remove (the tree does not know the size of a subtree), so the first call after
+        one of them counts all nodes, O(n). The order statistic tree always knows its count
+        """
+        if not self.length_known:
+            self.length = sum(1 for _ in self.subtree_nodes(self.root))
+            self.length_known = True
+        return self.length
+
+    def __len__(self):
+        """returns the number of values in the tree, see node_count"""
+        return self.node_count()
+
+    def stats(self):
+        """
+        Returns a dict with the number of nodes (count), the black height and the height (number of nodes
+        on the longest path from the root down).
+        black_height is kept up to date by every change and read in O(1), count is O(1) except in the case
+        described in node_count. The height can not be kept up to date without storing it in every node,
+        a rotation changes the height of a whole subtree. So it is found with a walk over the tree, O(n),
+        and kept until the tree changes: calls without an insert or remove between them are O(1).
+        """
+        if self.tree_height is None:
+            self.tree_height = self.height()
+        return {"count": self.node_count(), "black_height": self.root_black_height, "height": self.tree_height}
+
+    def height(self):
+        """Returns the number of nodes on the longest path from the root down, O(n)"""
+        nil = self.nil
+        height = 0
+        stack = [(self.root, 1)]
+        while stack:
+            node, depth = stack.pop()
+            if node is not nil:
+                height = max(height, depth)
+                stack.append((node._left, depth + 1))
+                stack.append((node._right, depth + 1))
+        return height
 
     def search(self, value):
         """Returns true if there is a node with a specific value, else returnes false"""
+        nil = self.nil
         node = self.root
-        while node != self.nil:
-            if value == node.value():
+        while node is not nil:
+            node_value = node._value
+            if value == node_value:
                 return True
-            elif value < node.value():
-                node = node.left()
-            else:
-                node = node.right()
+            node = node._left if value < node_value else node._right
         return False
 
     def get_node(self, value):
         """If a node exists it returns the node, else it returns False"""
+        nil = self.nil
         node = self.root
-        while node != self.nil:
-            if value == node.value():
+        while node is not nil:
+            node_value = node._value
+            if value == node_value:
                 return node
-            elif value < node.value():
-                node = node.left()
-            else:
-                node = node.right()
+            node = node._left if value < node_value else node._right
         return False
 
     def path(self, value):
         """
         If a value exists it returns a list of values from the root to the node
-        if the node does not exist it returns false
-        """
-        if self.search(value) is True:
-            path = []
-            node = self.root
-            while node != self.nil:
-                path.append(node.value())
-                if value == node.value():
-                    return path
-                elif value < node.value():
-                    node = node.left()
-                else:
-                    node = node.right()
+        if the node does not exist it returns false. The values are collected in the same descent that looks for value
+        """
+        nil = self.nil
+        path = []
+        node = self.root
+        while node is not nil:
+            node_value = node._value
+            path.append(node_value)
+            if value == node_value:
+                return path
+            node = node._left if value < node_value else node._right
+        return False
+
+    def successor(self, node):
+        """Returns the node with the next larger value, or nil if node is the largest"""
+        nil = self.nil
+        child = node._right
+        if child is not nil:
+            while child._left is not nil:
+                child = child._left
+            return child
+        parent = node._parent
+        while parent is not nil and node is parent._right:
+            node = parent
+            parent = parent._parent
+        return parent
+
+    def predecessor(self, node):
+        """Returns the node with the next smaller value, or nil if node is the smallest"""
+        nil = self.nil
+        child = node._left
+        if child is not nil:
+            while child._right is not nil:
+                child = child._right
+            return child
+        parent = node._parent
+        while parent is not nil and node is parent._left:
+            node = parent
+            parent = parent._parent
+        return parent
+
+    def ceiling_node(self, value, inclusive=True):
+        """Returns the node with the smallest value >= value (> value if not inclusive), or nil"""
+        nil = self.nil
+        found = nil
+        node = self.root
+        while node is not nil:
+            node_value = node._value
+            if value < node_value or (inclusive and value == node_value):
+                found = node
+                node = node._left
+            else:
+                node = node._right
+        return found
+
+    def floor_node(self, value, inclusive=True):
+        """Returns the node with the largest value <= value (< value if not inclusive), or nil"""
+        nil = self.nil
+        found = nil
+        node = self.root
+        while node is not nil:
+            node_value = node._value
+            if value > node_value or (inclusive and value == node_value):
+                found = node
+                node = node._right
+            else:
+                node = node._left
+        return found
+
+    def ceiling(self, value):
+        """Returns the smallest value in the tree that is >= value, None if there is none"""
+        return self.ceiling_node(value)._value
+
+    def floor(self, value):
+        """Returns the largest value in the tree that is <= value, None if there is none"""
+        return self.floor_node(value)._value
+
+    def __iter__(self):
+        """Yields the values in sorted order, following the successors instead of building a list"""
+        nil = self.nil
+        successor = self.successor
+        node = self.min_node
+        while node is not nil:
+            yield node._value
+            node = successor(node)
+
+    def __reversed__(self):
+        """Yields the values from the largest to the smallest"""
+        nil = self.nil
+        predecessor = self.predecessor
+        node = self.max_node
+        while node is not nil:
+            yield node._value
+            node = predecessor(node)
+
+    def irange(self, low=None, high=None, inclusive=(True, True), reverse=False):
+        """
+        Yields the values between low and high in sorted order (largest first if reverse is True).
+        A bound that is None is open, inclusive tells if low and high themselves are included.
+        Only the nodes in the range and the path down to the first one are visited.
+        """
+        nil = self.nil
+        if reverse:
+            node = self.max_node if high is None else self.floor_node(high, inclusive[1])
+            predecessor = self.predecessor
+            while node is not nil:
+                value = node._value
+                if low is not None and (value < low or (value == low and not inclusive[0])):
+                    return
+                yield value
+                node = predecessor(node)
+        else:
+            node = self.min_node if low is None else self.ceiling_node(low, inclusive[0])
+            successor = self.successor
+            while node is not nil:
+                value = node._value
+                if high is not None and (value > high or (value == high and not inclusive[1])):
+                    return
+                yield value
+                node = successor(node)
 
     def left_rotate(self, node):
         """
         left rotates with node as a pivot
         """
-        child = node.right()
-        node.set_right(child.left())
-        if child.left() != self.nil:
-            child.left().set_parent(node)
-        child.set_parent(node.parent())
-        if node.parent() == self.nil:
+        child = node._right
+        grandchild = child._left
+        node._right = grandchild
+        if grandchild is not self.nil:
+            grandchild._parent = node
+        parent = node._parent
+        child._parent = parent
+        if parent is self.nil:
             self.root = child
-        elif node == node.parent().left():
-            node.parent().set_left(child)
+        elif node is parent._left:
+            parent._left = child
         else:
-            node.parent().set_right(child)
-        child.set_left(node)
-        node.set_parent(child)
+            parent._right = child
+        child._left = node
+        node._parent = child
 
     def right_rotate(self, node):
         """
         right rotates with node as a pivot
         """
-        child = node.left()
-        node.set_left(child.right())
-        if child.right() != self.nil:
-            child.right().set_parent(node)
-        child.set_parent(node.parent())
-        if node.parent() == self.nil:
+        child = node._left
+        grandchild = child._right
+        node._left = grandchild
+        if grandchild is not self.nil:
+            grandchild._parent = node
+        parent = node._parent
+        child._parent = parent
+        if parent is self.nil:
             self.root = child
-        elif node == node.parent().right():
-            node.parent().set_right(child)
+        elif node is parent._right:
+            parent._right = child
         else:
-            node.parent().set_left(child)
-        child.set_right(node)
-        node.set_parent(child)
+            parent._left = child
+        child._right = node
+        node._parent = child
 
     def transplant(self, old, new):
         """new takes old place in the tree"""
-        if old.parent() == self.nil:
+        parent = old._parent
+        if parent is self.nil:
             self.root = new
-        elif old == old.parent().left():
-            old.parent().set_left(new)
+        elif old is parent._left:
+            parent._left = new
         else:
-            old.parent().set_right(new)
-        new.set_parent(old.parent())
+            parent._right = new
+        new._parent = parent
 
     def insert(self, value):
         """
         Finds the location where a node should be placed
         """
+        nil = self.nil
         node = self.root
-        parent = self.nil
-        while node != self.nil:
+        parent = nil
+        while node is not nil:
             parent = node
-            if value == node.value():
+            node_value = node._value
+            if value == node_value:
                 return
-            elif value < node.value():
-                node = node.left()
-            else:
-                node = node.right()
-        new_node = Node(value)
-        new_node.children(self.nil)
-        new_node.set_parent(parent)
-        if parent == self.nil:
+            node = node._left if value < node_value else node._right
+        self.attach(parent, value)
+
+    def attach(self, parent, value):
+        """
+        Links a new node with value as a child of parent (nil if the tree is empty),
+        fixes the tree and returns the new node.
+        A new leaf is the smallest node if it is the left child of the smallest node, the same for the largest
+        """
+        nil = self.nil
+        new_node = self.new_node(value)
+        new_node._left = nil
+        new_node._right = nil
+        new_node._parent = parent
+        self.length += 1
+        self.tree_height = None
+        if parent is nil:
             self.root = new_node
-            self.root.change_color("BLACK")
+            new_node._red = False
+            self.min_node = new_node
+            self.max_node = new_node
+            self.root_black_height = 1
         else:
-            if value < parent.value():
-                parent.set_left(new_node)
+            if value < parent._value:
+                parent._left = new_node
+                if parent is self.min_node:
+                    self.min_node = new_node
             else:
-                parent.set_right(new_node)
+                parent._right = new_node
+                if parent is self.max_node:
+                    self.max_node = new_node
             self.insert_fixup(new_node)
+        return new_node
+
+    def finger_node(self, finger, value):
+        """
+        Finds value starting from finger, a node in the tree with a value <= value (or nil to start at the root).
+        It climbs until value is inside the subtree and then descends, so values close to finger are found quickly.
+        Returns the node with value, or the node where value would be attached (nil if the tree is empty).
+        """
+        nil = self.nil
+        root = self.root
+        node = root if finger is nil else finger
+        while node is not root:
+            parent = node._parent
+            if node is parent._left and value < parent._value:
+                break
+            node = parent
+        last = nil
+        while node is not nil:
+            last = node
+            node_value = node._value
+            if value == node_value:
+                return node
+            node = node._left if value < node_value else node._right
+        return last
+
+    def insert_many(self, values):
+        """
+        Inserts every value in values. The batch is sorted so each value is searched
+        from the previous one with finger_node instead of from the root.
+        """
+        nil = self.nil
+        finger_node = self.finger_node
+        attach = self.attach
+        finger = nil
+        previous = None
+        for i, value in enumerate(sorted(values)):
+            if i > 0 and value == previous:
+                continue
+            previous = value
+            node = finger_node(finger, value)
+            if node is nil or node._value != value:
+                node = attach(node, value)
+            finger = node
+
+    def remove_many(self, values):
+        """Removes every value in values, searching the sorted batch with finger_node"""
+        nil = self.nil
+        finger_node = self.finger_node
+        predecessor = self.predecessor
+        finger = nil
+        for value in sorted(values):
+            node = finger_node(finger, value)
+            if node is nil:
+                return
+            node_value = node._value
+            if node_value == value:
+                finger = predecessor(node)
+                self.remove_node(node)
+            elif node_value < value:
+                finger = node
+            else:
+                finger = predecessor(node)
+
+    def contains_many(self, values):
+        """
+        Returns a list of bools, one for each value in values, that is True if the value is in the tree.
+        The values are looked up in sorted order with finger_node.
+        """
+        nil = self.nil
+        finger_node = self.finger_node
+        result = [False] * len(values)
+        order = sorted(range(len(values)), key=values.__getitem__)
+        finger = nil
+        for i in order:
+            value = values[i]
+            node = finger_node(finger, value)
+            if node is nil:
+                break
+            node_value = node._value
+            if node_value == value:
+                result[i] = True
+                finger = node
+            elif node_value < value:
+                finger = node
+        return result
 
     def insert_fixup(self, node):
         """
         insertion calls this function, it fixes the tree such as it keeps RBT properties
         """
-        while node.parent().color() == "RED":
-            if node.parent() == node.parent().parent().right():
-                uncle = node.parent().parent().left()
-                if uncle.color() == "RED":
-                    uncle.change_color("BLACK")
-                    node.parent().change_color("BLACK")
-                    node.parent().parent().change_color("RED")
-                    node = node.parent().parent()
+        parent = node._parent
+        while parent._red:
+            grandparent = parent._parent
+            if parent is grandparent._right:
+                uncle = grandparent._left
+                if uncle._red:
+                    uncle._red = False
+                    parent._red = False
+                    grandparent._red = True
+                    node = grandparent
                 else:
-                    if node == node.parent().left():
-                        node = node.parent()
+                    if node is parent._left:
+                        node = parent
                         self.right_rotate(node)
-                    node.parent().change_color("BLACK")
-                    node.parent().parent().change_color("RED")
-                    self.left_rotate(node.parent().parent())
+                        parent = node._parent
+                    parent._red = False
+                    grandparent._red = True
+                    self.left_rotate(grandparent)
             else:
-                uncle = node.parent().parent().right()
-                if uncle.color() == "RED":
-                    uncle.change_color("BLACK")
-                    node.parent().change_color("BLACK")
-                    node.parent().parent().change_color("RED")
-                    node = node.parent().parent()
+                uncle = grandparent._right
+                if uncle._red:
+                    uncle._red = False
+                    parent._red = False
+                    grandparent._red = True
+                    node = grandparent
                 else:
-                    if node == node.parent().right():
-                        node = node.parent()
+                    if node is parent._right:
+                        node = parent
                         self.left_rotate(node)
-                    node.parent().change_color("BLACK")
-                    node.parent().parent().change_color("RED")
-                    self.right_rotate(node.parent().parent())
-        self.root.change_color("BLACK")
+                        parent = node._parent
+                    parent._red = False
+                    grandparent._red = True
+                    self.right_rotate(grandparent)
+            parent = node._parent
+        root = self.root
+        if root._red: #the root was colored red, making it black adds a black node to every path
+            root._red = False
+            self.root_black_height += 1
 
     def remove(self, value):
         """Removes a node from the tree"""
         node = self.get_node(value)
         if node is not False:
-            tracker = node
-            tracker_color = tracker.color()
-            if node.left() == self.nil:
-                child = node.right()
-                self.transplant(node, child)
-            elif node.right() == self.nil:
-                child = node.left()
-                self.transplant(node, child)
+            self.remove_node(node)
+
+    def remove_node(self, node):
+        """
+        Removes a node that is known to be in the tree.
+        The nodes keep their values when the tree is relinked, so if node is the smallest node
+        its successor becomes the smallest one, and the predecessor of the largest node the largest one
+        """
+        nil = self.nil
+        self.length -= 1
+        self.tree_height = None
+        if node is self.min_node:
+            self.min_node = self.successor(node)
+        if node is self.max_node:
+            self.max_node = self.predecessor(node)
+        tracker = node
+        tracker_red = tracker._red
+        if node._left is nil:
+            child = node._right
+            self.transplant(node, child)
+        elif node._right is nil:
+            child = node._left
+            self.transplant(node, child)
+        else:
+            tracker = self.subtree_min(node._right)
+            tracker_red = tracker._red
+            child = tracker._right
+            if tracker._parent is node:
+                child._parent = tracker
             else:
-                tracker = self.subtree_min(node.right())
-                tracker_color = tracker.color()
-                child = tracker.right()
-                if tracker.parent() == node:
-                    child.set_parent(tracker)
-                else:
-                    self.transplant(tracker, child)
-                    tracker.set_right(node.right())
-                    tracker.right().set_parent(tracker)
-                self.transplant(node, tracker)
-                tracker.set_left(node.left())
-                tracker.left().set_parent(tracker)
-                tracker.change_color(node.color())
-            if tracker_color == "BLACK":
-                self.remove_fixup(child)
+                self.transplant(tracker, child)
+                tracker._right = node._right
+                tracker._right._parent = tracker
+            self.transplant(node, tracker)
+            tracker._left = node._left
+            tracker._left._parent = tracker
+            tracker._red = node._red
+        if not tracker_red:
+            self.remove_fixup(child)
 
     def remove_fixup(self, node):
-        """Is called by remove incase the tree needs fixing"""
-        while node != self.root and node.color() == "BLACK":
-            if node == node.parent().left():
-                sib = node.parent().right()
-                if sib.color() == "RED":
-                    sib.change_color("BLACK")
-                    sib.parent().change_color("RED")
-                    self.left_rotate(node.parent())
-                    sib = node.parent().right()
-                if sib.left().color() == "BLACK" and sib.right().color() == "BLACK":
-                    sib.change_color("RED")
-                    node = node.parent()
+        """
+        Is called by remove incase the tree needs fixing.
+        node is short of one black node, if that is moved up to the root every path lost a black node
+        """
+        while node is not self.root and not node._red:
+            parent = node._parent
+            if node is parent._left:
+                sib = parent._right
+                if sib._red:
+                    sib._red = False
+                    parent._red = True
+                    self.left_rotate(parent)
+                    sib = parent._right
+                if not sib._left._red and not sib._right._red:
+                    sib._red = True
+                    node = parent
                 else:
-                    if sib.right().color() == "BLACK":
-                        sib.left().change_color("BLACK")
-                        sib.change_color("RED")
+                    if not sib._right._red:
+                        sib._left._red = False
+                        sib._red = True
                         self.right_rotate(sib)
-                        sib = node.parent().right()
-                    sib.change_color(node.parent().color())
-                    node.parent().change_color("BLACK")
-                    sib.right().change_color("BLACK")
-                    self.left_rotate(node.parent())
-                    node = self.root
+                        sib = parent._right
+                    sib._red = parent._red
+                    parent._red = False
+                    sib._right._red = False
+                    self.left_rotate(parent)
+                    break
             else:
-                sib = node.parent().left()
-                if sib.color() == "RED":
-                    sib.change_color("BLACK")
-                    sib.parent().change_color("RED")
-                    self.right_rotate(node.parent())
-                    sib = node.parent().left()
-                if sib.left().color() == "BLACK" and sib.right().color() == "BLACK":
-                    sib.change_color("RED")
-                    node = node.parent()
+                sib = parent._left
+                if sib._red:
+                    sib._red = False
+                    parent._red = True
+                    self.right_rotate(parent)
+                    sib = parent._left
+                if not sib._left._red and not sib._right._red:
+                    sib._red = True
+                    node = parent
                 else:
-                    if sib.left().color() == "BLACK":
-                        sib.right().change_color("BLACK")
-                        sib.change_color("RED")
+                    if not sib._left._red:
+                        sib._right._red = False
+                        sib._red = True
                         self.left_rotate(sib)
-                        sib = node.parent().left()
-                    sib.change_color(node.parent().color())
-                    node.parent().change_color("BLACK")
-                    sib.left().change_color("BLACK")
-                    self.right_rotate(node.parent())
-                    node = self.root
-        node.change_color("BLACK")
+                        sib = parent._left
+                    sib._red = parent._red
+                    parent._red = False
+                    sib._left._red = False
+                    self.right_rotate(parent)
+                    break
+        if node is self.root and not node._red:
+            self.root_black_height -= 1
+        node._red = False
+
+    def clear(self):
+        """Makes the tree empty"""
+        self.root = self.nil
+        self.length = 0
+        self.length_known = True
+        self.min_node = self.nil
+        self.max_node = self.nil
+        self.root_black_height = 0
+        self.tree_height = 0
+
+    def subtree_nodes(self, node):
+        """Yields the nodes of a subtree, parents before children"""
+        nil = self.nil
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node is not nil:
+                yield node
+                stack.append(node._right)
+                stack.append(node._left)
+
+    def black_height(self, node):
+        """Returns the number of black nodes on a path from node down to nil, node included"""
+        nil = self.nil
+        height = 0
+        while node is not nil:
+            if not node._red:
+                height += 1
+            node = node._left
+        return height
+
+    def refresh(self, node):
+        """
+        join calls this for every node whose subtree changed, bottom up, so a subclass can recompute
+        what a node stores about its subtree from its children. The red black tree stores nothing.
+        """
+
+    def take(self, other):
+        """union and join call this before the nodes of other are moved into self, subclasses count them here"""
+        self.length += other.length
+        if not other.length_known:
+            self.length_known = False
+
+    def drop(self, node):
+        """A set operation calls this for every node that it removes, subclasses count it here"""
+        self.length -= 1
+
+    def drop_subtree(self, node):
+        """
+        intersection and remove_range call this with a whole subtree that is removed, subclasses count it here.
+        The red black tree does not know the size of the subtree, the length is counted again by len()
+        """
+        if node is not self.nil:
+            self.length_known = False
+
+    def moved(self, right):
+        """split calls this after the nodes of the tree right were moved out of self, subclasses count them here"""
+        self.length_known = False
+        right.length_known = False
+
+    def adopt(self, other):
+        """
+        Lets the nodes of self and other point to the same nil node so they can be linked together.
+        The trees are walked side by side until the smaller one is done, the leaves of the smaller
+        tree are linked to the nil node of the larger one and self keeps that nil node, O(size of the smaller tree).
+        """
+        if other.nil is self.nil:
+            return
+        if type(other.nil) is not type(self.nil):
+            raise TypeError("the trees must have the same type of nodes")
+        mine = self.subtree_nodes(self.root)
+        theirs = other.subtree_nodes(other.root)
+        while True:
+            if next(mine, None) is None:
+                smaller = self
+                break
+            if next(theirs, None) is None:
+                smaller = other
+                break
+        larger = other if smaller is self else self
+        old_nil = smaller.nil
+        new_nil = larger.nil
+        for node in list(smaller.subtree_nodes(smaller.root)):
+            if node._left is old_nil:
+                node._left = new_nil
+            if node._right is old_nil:
+                node._right = new_nil
+        if smaller.root is old_nil:
+            smaller.root = new_nil
+        else:
+            smaller.root._parent = new_nil
+        if smaller is self: #self takes the nil node of other and other the unused one of self
+            self.nil, other.nil = new_nil, old_nil
+        else:
+            other.nil = new_nil
+
+    def set_root(self, node, height):
+        """
+        Makes node the black root of the tree, height is the black height of its subtree.
+        The smallest and largest node are found again, O(log n)
+        """
+        nil = self.nil
+        self.root = node
+        self.tree_height = None
+        if node is nil:
+            self.min_node = nil
+            self.max_node = nil
+            self.root_black_height = 0
+            return
+        node._parent = nil
+        if node._red:
+            node._red = False
+            height += 1
+        self.min_node = self.subtree_min(node)
+        self.max_node = self.subtree_max(node)
+        self.root_black_height = height
+
+    def join_nodes(self, left, left_height, middle, right, right_height):
+        """
+        Links the subtrees left and right with the node middle between them and returns (new root, its black height).
+        All values in left are smaller than the value of middle and all in right are larger,
+        left_height and right_height are their black heights (see black_height), the callers know them
+        so no subtree has to be walked to find them.
+        middle is linked on the spine of the higher subtree where the black height of the lower one is reached,
+        then the colors are fixed like after an insert, O(difference of the black heights).
+        self.root and self.root_black_height are used while fixing, the caller sets the real root afterwards.
+        """
+        nil = self.nil
+        if left is not nil:
+            left._parent = nil
+            if left._red: #a red root is made black, that adds a black node to its paths
+                left._red = False
+                left_height += 1
+        if right is not nil:
+            right._parent = nil
+            if right._red:
+                right._red = False
+                right_height += 1
+        middle._red = True
+        if left_height == right_height:
+            middle._left = left
+            middle._right = right
+            if left is not nil:
+                left._parent = middle
+            if right is not nil:
+                right._parent = middle
+            middle._parent = nil
+            middle._red = False
+            self.refresh(middle)
+            return middle, left_height + 1
+        if left_height > right_height: #middle goes down the right spine of left
+            node = left
+            height = left_height
+            while node._red or height > right_height:
+                if not node._red:
+                    height -= 1
+                parent = node
+                node = node._right
+            parent._right = middle
+            middle._left = node
+            middle._right = right
+            self.root = left
+            self.root_black_height = left_height
+        else: #middle goes down the left spine of right
+            node = right
+            height = right_height
+            while node._red or height > left_height:
+                if not node._red:
+                    height -= 1
+                parent = node
+                node = node._left
+            parent._left = middle
+            middle._left = left
+            middle._right = node
+            self.root = right
+            self.root_black_height = right_height
+        middle._parent = parent
+        if middle._left is not nil:
+            middle._left._parent = middle
+        if middle._right is not nil:
+            middle._right._parent = middle
+        node = middle
+        while node is not nil:
+            self.refresh(node)
+            node = node._parent
+        RedBlackTree.insert_fixup(self, middle) #subclasses count inserted leaves in insert_fixup, middle is not one
+        return self.root, self.root_black_height
+
+    def split_nodes(self, node, height, value):
+        """
+        Splits the subtree of node (with black height height) into the subtree of the values smaller than value
+        and the one of the larger values. Returns (smaller, its black height, node of value or None,
+        larger, its black height). Each level does one join whose cost is the difference of the black heights,
+        the differences add up to the height of the subtree, so the split is O(log n).
+        """
+        nil = self.nil
+        if node is nil:
+            return nil, 0, None, nil, 0
+        left = node._left
+        right = node._right
+        child_height = height if node._red else height - 1
+        if value == node._value:
+            return left, child_height, node, right, child_height
+        if value < node._value:
+            smaller, smaller_height, found, larger, larger_height = self.split_nodes(left, child_height, value)
+            larger, larger_height = self.join_nodes(larger, larger_height, node, right, child_height)
+            return smaller, smaller_height, found, larger, larger_height
+        smaller, smaller_height, found, larger, larger_height = self.split_nodes(right, child_height, value)
+        smaller, smaller_height = self.join_nodes(left, child_height, node, smaller, smaller_height)
+        return smaller, smaller_height, found, larger, larger_height
+
+    def join2_nodes(self, left, left_height, right, right_height):
+        """Links the subtrees left and right when there is no node to put between them, returns (root, black height)"""
+        if left is self.nil:
+            return right, right_height
+        if right is self.nil:
+            return left, left_height
+        largest = self.subtree_max(left)
+        left, left_height, largest, _, _ = self.split_nodes(left, left_height, largest._value)
+        return self.join_nodes(left, left_height, largest, right, right_height)
+
+    def union_nodes(self, mine, mine_height, theirs, theirs_height):
+        """
+        Returns (root, black height) of the union of two subtrees with the given black heights,
+        for a value in both the node from mine is kept
+        """
+        nil = self.nil
+        if theirs is nil:
+            return mine, mine_height
+        if mine is nil:
+            return theirs, theirs_height
+        left = mine._left
+        right = mine._right
+        child_height = mine_height if mine._red else mine_height - 1
+        smaller, smaller_height, found, larger, larger_height = self.split_nodes(theirs, theirs_height, mine._value)
+        if found is not None:
+            self.drop(found)
+        left, left_height = self.union_nodes(left, child_height, smaller, smaller_height)
+        right, right_height = self.union_nodes(right, child_height, larger, larger_height)
+        return self.join_nodes(left, left_height, mine, right, right_height)
+
+    def intersection_nodes(self, mine, mine_height, theirs, theirs_height):
+        """Returns (root, black height) of the intersection of two subtrees, made of the nodes from mine"""
+        nil = self.nil
+        if mine is nil:
+            return nil, 0
+        if theirs is nil:
+            self.drop_subtree(mine)
+            return nil, 0
+        left = mine._left
+        right = mine._right
+        child_height = mine_height if mine._red else mine_height - 1
+        smaller, smaller_height, found, larger, larger_height = self.split_nodes(theirs, theirs_height, mine._value)
+        left, left_height = self.intersection_nodes(left, child_height, smaller, smaller_height)
+        right, right_height = self.intersection_nodes(right, child_height, larger, larger_height)
+        if found is not None:
+            return self.join_nodes(left, left_height, mine, right, right_height)
+        self.drop(mine)
+        return self.join2_nodes(left, left_height, right, right_height)
+
+    def difference_nodes(self, mine, mine_height, theirs, theirs_height):
+        """Returns (root, black height) of the values of mine that are not in theirs"""
+        nil = self.nil
+        if mine is nil or theirs is nil:
+            return mine, mine_height
+        left = mine._left
+        right = mine._right
+        child_height = mine_height if mine._red else mine_height - 1
+        smaller, smaller_height, found, larger, larger_height = self.split_nodes(theirs, theirs_height, mine._value)
+        left, left_height = self.difference_nodes(left, child_height, smaller, smaller_height)
+        right, right_height = self.difference_nodes(right, child_height, larger, larger_height)
+        if found is not None:
+            self.drop(mine)
+            return self.join2_nodes(left, left_height, right, right_height)
+        return self.join_nodes(left, left_height, mine, right, right_height)
+
+    def join(self, value, right):
+        """
+        Appends value and the values of the tree right to self, every value of self must be smaller than value
+        and every value of right larger. The nodes of right are moved, right is empty afterwards.
+        O(log n) when the trees share their nil node (after a split), otherwise the smaller tree is relinked first.
+        Returns False if the values are not in order, else True.
+        """
+        if (self.root is not self.nil and not self.max() < value) or \
+                (right.root is not right.nil and not value < right.min()):
+            return False
+        self.adopt(right)
+        self.take(right)
+        self.length += 1
+        middle = self.new_node(value)
+        root, height = self.join_nodes(self.root, self.root_black_height, middle, right.root, right.root_black_height)
+        self.set_root(root, height)
+        right.clear()
+        return True
+
+    def split(self, value):
+        """
+        Splits the tree at value in O(log n): self keeps the values smaller than value and a new tree
+        with the larger values is made from the nodes of self. value itself is removed.
+        Returns (self, True if value was in the tree, the new tree).
+        The two trees share their nil node, so they can be joined again cheaply, but they must not be
+        changed from different threads at the same time.
+        """
+        smaller, smaller_height, found, larger, larger_height = self.split_nodes(self.root, self.root_black_height, value)
+        if found is not None:
+            self.drop(found)
+        right = type(self)()
+        right.nil = self.nil
+        right.set_root(larger, larger_height)
+        self.set_root(smaller, smaller_height)
+        self.moved(right)
+        return self, found is not None, right
+
+    def union(self, other):
+        """
+        Moves the values of other into self, other is empty afterwards. For a value in both trees the node of self is kept.
+        The nodes are reused, nothing is copied. O(m log(n/m + 1)) for trees with n and m values, m <= n.
+        Returns self.
+        """
+        if other is self:
+            return self
+        self.adopt(other)
+        self.take(other)
+        self.set_root(*self.union_nodes(self.root, self.root_black_height, other.root, other.root_black_height))
+        other.clear()
+        return self
+
+    def intersection(self, other):
+        """Keeps only the values of self that are also in other, other is empty afterwards. Returns self."""
+        if other is self:
+            return self
+        self.adopt(other)
+        self.set_root(*self.intersection_nodes(self.root, self.root_black_height, other.root, other.root_black_height))
+        other.clear()
+        return self
+
+    def difference(self, other):
+        """Removes the values of other from self, other is empty afterwards. Returns self."""
+        if other is self:
+            self.drop_subtree(self.root)
+            self.clear()
+            return self
+        self.adopt(other)
+        self.set_root(*self.difference_nodes(self.root, self.root_black_height, other.root, other.root_black_height))
+        other.clear()
+        return self
+
+    def remove_range(self, low, high):
+        """
+        Removes every value v with low <= v <= high by splitting the range out of the tree
+        and joining the rest, O(log n) however many values are removed.
+        """
+        if high < low:
+            return
+        smaller, smaller_height, low_node, rest, rest_height = self.split_nodes(self.root, self.root_black_height, low)
+        middle, _, high_node, larger, larger_height = self.split_nodes(rest, rest_height, high)
+        for node in (low_node, high_node):
+            if node is not None:
+                self.drop(node)
+        self.drop_subtree(middle)
+        self.set_root(*self.join2_nodes(smaller, smaller_height, larger, larger_height))
 
     @staticmethod
     def convert(nodes):
         """Transformes each node in a list to a list of values"""
         for i in range(len(nodes)):
-            data_dict = nodes[i].__dict__
-            value = data_dict["_value"]
-            color = data_dict["_color"]
-            left = data_dict["_left"]
-            right = data_dict["_right"]
-            data = [value, color, left.value(), right.value()]
+            node = nodes[i]
+            data = [node.value(), node.color(), node.left().value(), node.right().value()]
             nodes[i] = data
         return nodes
 
@@ -348,3 +1066,145 @@ class RedBlackTree:
                 nodes = children
             bfs_list = self.convert(bfs_list)
         return bfs_list
+
+    def save(self, path):
+        """
+        Writes the tree to path as a snapshot: a header followed by the values in sorted order
+        as a little endian array of 64 bit ints ("q") or floats ("d").
+        The shape and colors are not stored, load builds a balanced tree from the sorted values.
+        Raises TypeError if the values are not all ints or all floats (bools are not ints here),
+        so no value is changed on the way to the file.
+        """
+        values = list(self)
+        types = {type(value) for value in values}
+        if types - {int, float}:
+            name = next(iter(types - {int, float})).__name__
+            raise TypeError(f"only int and float values can be saved, not {name}")
+        if len(types) > 1:
+            raise TypeError("ints and floats can not be saved in one snapshot, a float would round large ints")
+        typecode = "d" if float in types else "q"
+        data = array(typecode, values)
+        if sys.byteorder == "big":
+            data.byteswap()
+        with open(path, "wb") as file:
+            file.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, typecode.encode(), len(data)))
+            data.tofile(file)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """
+        Reads a snapshot written by save.
+        With mmap True the file is memory mapped and a read only MappedTree is returned,
+        no node objects are created so lookups can start right away.
+        With mmap False a normal tree is built with from_iterable.
+        """
+        if mmap:
+            return MappedTree(path)
+        with open(path, "rb") as file:
+            typecode, size = read_snapshot_header(file.read(SNAPSHOT_HEADER.size))
+            values = array(typecode)
+            values.fromfile(file, size)
+        if sys.byteorder == "big":
+            values.byteswap()
+        return cls.from_iterable(values, presorted=True)
+
+
+def read_snapshot_header(header):
+    """Checks a snapshot header and returns the typecode and number of values"""
+    if len(header) < SNAPSHOT_HEADER.size:
+        raise ValueError("not a red black tree snapshot")
+    magic, version, typecode, size = SNAPSHOT_HEADER.unpack(header)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or typecode not in (b"q", b"d"):
+        raise ValueError("not a red black tree snapshot")
+    return typecode.decode(), size
+
+
+class MappedTree:
+    """
+    A read only tree over a memory mapped snapshot file.
+    The sorted values are used straight from the file and searched with binary search,
+    it answers the same lookups as a red black tree in O(log n).
+    """
+    def __init__(self, path):
+        """Maps the file and checks its header"""
+        with open(path, "rb") as file:
+            self._map = MemoryMap(file.fileno(), 0, access=ACCESS_READ)
+        typecode, size = read_snapshot_header(self._map[:SNAPSHOT_HEADER.size])
+        end = SNAPSHOT_HEADER.size + size * 8
+        if len(self._map) < end: #a cut off file would silently give fewer values
+            self._map.close()
+            raise ValueError("not a red black tree snapshot")
+        if sys.byteorder == "big":
+            self._values = array(typecode, self._map[SNAPSHOT_HEADER.size:end])
+            self._values.byteswap()
+        else:
+            self._values = memoryview(self._map)[SNAPSHOT_HEADER.size:end].cast(typecode)
+
+    def close(self):
+        """Releases the memory map, the tree can not be used after this"""
+        if isinstance(self._values, memoryview):
+            self._values.release()
+        self._map.close()
+
+    def __enter__(self):
+        """The tree can be used in a with statement that closes it"""
+        return self
+
+    def __exit__(self, *exc_info):
+        """Closes the tree when the with statement ends"""
+        self.close()
+
+    def __len__(self):
+        """returns the number of values in the tree"""
+        return len(self._values)
+
+    def __iter__(self):
+        """Yields the values in sorted order"""
+        return iter(self._values)
+
+    def __reversed__(self):
+        """Yields the values from the largest to the smallest"""
+        values = self._values
+        for i in range(len(values) - 1, -1, -1):
+            yield values[i]
+
+    def search(self, value):
+        """Returns true if value is in the tree, else returns false"""
+        values = self._values
+        i = bisect_left(values, value)
+        return i < len(values) and values[i] == value
+
+    def contains_many(self, values):
+        """Returns a list of bools telling if each value is in the tree"""
+        return [self.search(value) for value in values]
+
+    def min(self):
+        """Returns the smallest value, None if the tree is empty"""
+        return self._values[0] if len(self._values) else None
+
+    def max(self):
+        """Returns the largest value, None if the tree is empty"""
+        return self._values[-1] if len(self._values) else None
+
+    def ceiling(self, value):
+        """Returns the smallest value in the tree that is >= value, None if there is none"""
+        i = bisect_left(self._values, value)
+        return self._values[i] if i < len(self._values) else None
+
+    def floor(self, value):
+        """Returns the largest value in the tree that is <= value, None if there is none"""
+        i = bisect_right(self._values, value)
+        return self._values[i - 1] if i > 0 else None
+
+    def irange(self, low=None, high=None, inclusive=(True, True), reverse=False):
+        """Yields the values between low and high like RedBlackTree.irange"""
+        values = self._values
+        first = 0
+        last = len(values)
+        if low is not None:
+            first = bisect_left(values, low) if inclusive[0] else bisect_right(values, low)
+        if high is not None:
+            last = bisect_right(values, high) if inclusive[1] else bisect_left(values, high)
+        indexes = range(last - 1, first - 1, -1) if reverse else range(first, last)
+        for i in indexes:
+            yield values[i]
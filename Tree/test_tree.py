@@ -0,0 +1,221 @@
+"""
+Checks the red black trees: after every operation the red black properties, len, min, max
+and the contents are compared with a set or dict that had the same operations.
+Run from the Tree folder with: python test_tree.py
+"""
+import random
+import sys
+
+from order_statistic_tree import OrderStatisticTree
+from red_black_tree import RedBlackTree
+from tree_map import TreeMap, TreeMultiset
+
+TREE_CLASSES = [RedBlackTree, OrderStatisticTree, TreeMap, TreeMultiset]
+TRIALS = 100 # random trials per operation and tree class
+SPAN = 500 # values are taken from range(SPAN)
+MAX_SIZE = 200
+SEED = 2021
+
+
+def check_node(tree, node, low, high):
+    """
+    Checks the subtree of node: parent links, values between low and high, no red node with a red child,
+    the same black height on every path and (order statistic tree) the subtree sizes.
+    Returns the black height, or None if something is wrong.
+    """
+    if node is tree.nil:
+        return 0
+    value = node.value()
+    if (low is not None and not low < value) or (high is not None and not value < high):
+        return None
+    for child in (node.left(), node.right()):
+        if child is not tree.nil and child.parent() is not node:
+            return None
+        if node.color() == "RED" and child.color() == "RED":
+            return None
+    left = check_node(tree, node.left(), low, value)
+    right = check_node(tree, node.right(), value, high)
+    if left is None or right is None or left != right:
+        return None
+    if isinstance(tree, OrderStatisticTree) and node.size() != node.left().size() + node.right().size() + 1:
+        return None
+    return left + (node.color() == "BLACK")
+
+
+def check_tree(tree, reference):
+    """
+    Checks the red black properties, stats, len, min, max and the contents of tree against reference:
+    a set of values, a dict of keys and values (TreeMap) or a dict of values and counts (TreeMultiset)
+    """
+    if tree.nil.color() != "BLACK" or tree.root.color() != "BLACK":
+        return False
+    if tree.root is not tree.nil and tree.root.parent() is not tree.nil:
+        return False
+    black_height = check_node(tree, tree.root, None, None)
+    if black_height is None:
+        return False
+    keys = sorted(reference)
+    if tree.stats() != {"count": len(keys), "black_height": black_height, "height": tree.height()}:
+        return False
+    if isinstance(tree, TreeMultiset):
+        contents = list(tree) == [key for key in keys for _ in range(reference[key])]
+        length = sum(reference.values())
+    elif isinstance(tree, TreeMap):
+        contents = list(tree.items()) == [(key, reference[key]) for key in keys]
+        length = len(keys)
+    else:
+        contents = list(tree) == keys
+        length = len(keys)
+    if not contents or len(tree) != length:
+        return False
+    if keys:
+        return tree.min() == keys[0] and tree.max() == keys[-1]
+    return tree.min() is None and tree.max() is None
+
+
+def make_tree(tree_class, rand):
+    """Returns a random tree of tree_class and its reference, built with from_iterable or with inserts"""
+    values = [rand.randrange(SPAN) for _ in range(rand.randrange(MAX_SIZE))]
+    if tree_class is TreeMultiset:
+        tree = tree_class.from_iterable(values) if rand.random() < 0.5 else tree_class()
+        if not len(tree):
+            tree.insert_many(values)
+        reference = {}
+        for value in values:
+            reference[value] = reference.get(value, 0) + 1
+    elif tree_class is TreeMap:
+        tree = tree_class()
+        reference = {}
+        for value in values:
+            tree[value] = -value
+            reference[value] = -value
+    else:
+        tree = tree_class.from_iterable(values) if rand.random() < 0.5 else tree_class()
+        for value in values:
+            tree.insert(value)
+        reference = set(values)
+    return tree, reference
+
+
+def keep(reference, keys):
+    """Returns the part of reference with the given keys, of the same type as reference"""
+    if isinstance(reference, dict):
+        return {key: reference[key] for key in keys}
+    return set(keys)
+
+
+def check_insert_remove(tree, reference, rand):
+    """Inserts and removes random values, with and without the batch methods"""
+    for _ in range(50):
+        value = rand.randrange(SPAN)
+        if rand.random() < 0.5:
+            if isinstance(tree, TreeMultiset):
+                tree.insert(value)
+                reference[value] = reference.get(value, 0) + 1
+            elif isinstance(tree, TreeMap):
+                tree[value] = value
+                reference[value] = value
+            else:
+                tree.insert(value)
+                reference.add(value)
+        else:
+            tree.remove(value)
+            if isinstance(tree, TreeMultiset) and reference.get(value, 0) > 1:
+                reference[value] -= 1
+            elif isinstance(reference, dict):
+                reference.pop(value, None)
+            else:
+                reference.discard(value)
+        if not check_tree(tree, reference):
+            return False
+    if isinstance(tree, TreeMap):
+        return True
+    batch = [rand.randrange(SPAN) for _ in range(30)]
+    tree.remove_many(batch)
+    reference -= set(batch)
+    if not check_tree(tree, reference):
+        return False
+    tree.insert_many(batch)
+    reference |= set(batch)
+    return check_tree(tree, reference)
+
+
+def check_union(tree, reference, other, other_reference):
+    """union keeps the value of tree for a key in both"""
+    tree.union(other)
+    merged = keep(other_reference, other_reference)
+    if isinstance(reference, dict):
+        merged.update(reference)
+    else:
+        merged |= reference
+    return check_tree(tree, merged) and check_tree(other, keep(other_reference, []))
+
+
+def check_intersection(tree, reference, other, other_reference):
+    """intersection keeps the keys that are in both trees"""
+    tree.intersection(other)
+    result = keep(reference, [key for key in reference if key in other_reference])
+    return check_tree(tree, result) and check_tree(other, keep(other_reference, []))
+
+
+def check_difference(tree, reference, other, other_reference):
+    """difference keeps the keys of tree that are not in other"""
+    tree.difference(other)
+    result = keep(reference, [key for key in reference if key not in other_reference])
+    return check_tree(tree, result) and check_tree(other, keep(other_reference, []))
+
+
+def check_remove_range(tree, reference, rand):
+    """remove_range removes every key from low to high, both included"""
+    low = rand.randrange(SPAN)
+    high = low + rand.randrange(SPAN // 2)
+    tree.remove_range(low, high)
+    return check_tree(tree, keep(reference, [key for key in reference if not low <= key <= high]))
+
+
+def check_split_join(tree, reference, rand):
+    """split removes the value and moves the larger keys to a new tree, join puts them back together"""
+    value = rand.randrange(SPAN)
+    left, found, right = tree.split(value)
+    if left is not tree or found != (value in reference):
+        return False
+    smaller = keep(reference, [key for key in reference if key < value])
+    larger = keep(reference, [key for key in reference if key > value])
+    if not check_tree(left, smaller) or not check_tree(right, larger):
+        return False
+    if not left.join(value, right):
+        return False
+    if isinstance(reference, dict):
+        smaller.update(larger)
+        smaller[value] = 1 if isinstance(tree, TreeMultiset) else None
+    else:
+        smaller |= larger | {value}
+    if not check_tree(left, smaller) or not check_tree(right, keep(reference, [])):
+        return False
+    return left.join(value, type(tree)()) is False # value is already in left, so it is not larger than its max
+
+
+def test_trees():
+    """Runs every check on every tree class"""
+    rand = random.Random(SEED)
+    checks = {
+        "insert and remove": lambda tree, reference: check_insert_remove(tree, reference, rand),
+        "union": lambda tree, reference: check_union(tree, reference, *make_tree(type(tree), rand)),
+        "intersection": lambda tree, reference: check_intersection(tree, reference, *make_tree(type(tree), rand)),
+        "difference": lambda tree, reference: check_difference(tree, reference, *make_tree(type(tree), rand)),
+        "remove_range": lambda tree, reference: check_remove_range(tree, reference, rand),
+        "split and join": lambda tree, reference: check_split_join(tree, reference, rand),
+    }
+    for tree_class in TREE_CLASSES:
+        for name, check in checks.items():
+            for _ in range(TRIALS):
+                tree, reference = make_tree(tree_class, rand)
+                if not check_tree(tree, reference) or not check(tree, reference):
+                    print(f'Test failed! {name}: {tree_class.__name__}')
+                    sys.exit(1)
+            print(f'Correct {name}: {tree_class.__name__}')
+    print('\nAll tests passed successfully!')
+
+
+if __name__ == '__main__':
+    test_trees()
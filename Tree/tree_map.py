@@ -0,0 +1,262 @@
+"""Sorted dictionary and multiset built on the red black tree"""
+from red_black_tree import Node, RedBlackTree
+
+MISSING = object()
+
+
+class MapNode(Node):
+    """
+    A node that also stores a payload next to its value (the key)
+    item - anything
+    """
+    __slots__ = ("_item",)
+
+    def __init__(self, value):
+        """A new node has no payload yet"""
+        super().__init__(value)
+        self._item = None
+
+    def item(self):
+        """returns the payload of a node"""
+        return self._item
+
+    def set_item(self, item):
+        """sets the payload of a node"""
+        self._item = item
+
+
+class TreeMap(RedBlackTree):
+    """
+    A red black tree that maps keys to values and keeps the keys sorted.
+    The value is stored in the node of its key, so every operation is a single descent
+    and no extra dict is needed next to the tree.
+    """
+    @staticmethod
+    def new_node(value):
+        """Creates a node that can store a payload"""
+        return MapNode(value)
+
+    def save(self, path):
+        """
+        A snapshot only holds the keys as ints or floats, the values
+        (and the counts of a multiset) would be lost. So a map can not be saved, raises TypeError
+        """
+        raise TypeError(f"a {type(self).__name__} can not be saved, a snapshot only has keys")
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """A snapshot has no values to load into a map, raises TypeError, see save"""
+        raise TypeError(f"a {cls.__name__} can not be loaded, a snapshot only has keys")
+
+    def locate(self, key):
+        """Returns the node of key, creating it if it is missing, with one descent"""
+        node = self.finger_node(self.nil, key)
+        if node == self.nil or node.value() != key:
+            node = self.attach(node, key)
+        return node
+
+    def nodes(self):
+        """Yields the nodes in sorted order"""
+        if self.root != self.nil:
+            node = self.subtree_min(self.root)
+            while node != self.nil:
+                yield node
+                node = self.successor(node)
+
+    def __contains__(self, key):
+        """returns True if key is in the map"""
+        return self.search(key)
+
+    def __getitem__(self, key):
+        """Returns the value of key, raises KeyError if key is missing"""
+        node = self.get_node(key)
+        if node is False:
+            raise KeyError(key)
+        return node.item()
+
+    def __setitem__(self, key, value):
+        """Sets the value of key, the key is added if it is missing"""
+        self.locate(key).set_item(value)
+
+    def __delitem__(self, key):
+        """Removes key and its value, raises KeyError if key is missing"""
+        node = self.get_node(key)
+        if node is False:
+            raise KeyError(key)
+        self.remove_node(node)
+
+    def get(self, key, default=None):
+        """Returns the value of key, or default if key is missing"""
+        node = self.get_node(key)
+        if node is False:
+            return default
+        return node.item()
+
+    def pop(self, key, default=MISSING):
+        """
+        Removes key and returns its value.
+        If key is missing default is returned, or KeyError is raised if no default is given.
+        """
+        node = self.get_node(key)
+        if node is False:
+            if default is MISSING:
+                raise KeyError(key)
+            return default
+        item = node.item()
+        self.remove_node(node)
+        return item
+
+    def setdefault(self, key, default=None):
+        """Returns the value of key, if key is missing it is added with default as value"""
+        node = self.finger_node(self.nil, key)
+        if node == self.nil or node.value() != key:
+            node = self.attach(node, key)
+            node.set_item(default)
+        return node.item()
+
+    def keys(self):
+        """Yields the keys in sorted order"""
+        return iter(self)
+
+    def values(self):
+        """Yields the values in the sorted order of their keys"""
+        for node in self.nodes():
+            yield node.item()
+
+    def items(self):
+        """Yields (key, value) pairs in sorted order"""
+        for node in self.nodes():
+            yield node.value(), node.item()
+
+
+class TreeMultiset(TreeMap):
+    """
+    A sorted multiset, each node stores how many times its value was inserted.
+    remove takes away one copy and the node is removed when the last copy is gone.
+    """
+    def __init__(self):
+        """The multiset starts empty"""
+        super().__init__()
+        self.total = 0
+
+    @classmethod
+    def from_iterable(cls, values, presorted=False):
+        """Builds a balanced multiset like RedBlackTree.from_iterable but keeps the duplicates"""
+        keys = []
+        counts = []
+        for value in (values if presorted else sorted(values)):
+            if keys and keys[-1] == value:
+                counts[-1] += 1
+            else:
+                keys.append(value)
+                counts.append(1)
+        tree = super().from_iterable(keys, presorted=True)
+        for node, count in zip(tree.nodes(), counts):
+            node.set_item(count)
+        tree.total = sum(counts)
+        return tree
+
+    def __len__(self):
+        """returns the number of values in the multiset, duplicates included"""
+        return self.total
+
+    def __iter__(self):
+        """Yields the values in sorted order, each value as many times as it was inserted"""
+        for node in self.nodes():
+            for _ in range(node.item()):
+                yield node.value()
+
+    def count(self, value):
+        """Returns how many times value is in the multiset"""
+        node = self.get_node(value)
+        if node is False:
+            return 0
+        return node.item()
+
+    def insert(self, value):
+        """Adds one copy of value"""
+        node = self.finger_node(self.nil, value)
+        if node == self.nil or node.value() != value:
+            node = self.attach(node, value)
+            node.set_item(0)
+        node.set_item(node.item() + 1)
+        self.total += 1
+
+    def __setitem__(self, key, count):
+        """Sets how many copies of key there are, a count of 0 or less removes key"""
+        if count <= 0:
+            node = self.get_node(key)
+            if node is not False:
+                self.remove_node(node)
+            return
+        node = self.locate(key)
+        self.total += count - (node.item() or 0)
+        node.set_item(count)
+
+    def remove_node(self, node):
+        """Removes a node and all copies of its value"""
+        self.total -= node.item()
+        super().remove_node(node)
+
+    def clear(self):
+        """Removes every value"""
+        super().clear()
+        self.total = 0
+
+    def take(self, other):
+        """Counts the values of other that union or join moves into self"""
+        super().take(other)
+        self.total += other.total
+
+    def drop(self, node):
+        """Counts the copies of a value removed by a set operation"""
+        super().drop(node)
+        self.total -= node.item()
+
+    def drop_subtree(self, node):
+        """Counts the copies in a subtree removed as a whole, O(size of the subtree)"""
+        super().drop_subtree(node)
+        for child in self.subtree_nodes(node):
+            self.total -= child.item()
+
+    def moved(self, right):
+        """Counts the copies that split moved to right, O(size of right)"""
+        super().moved(right)
+        for node in right.subtree_nodes(right.root):
+            right.total += node.item()
+        self.total -= right.total
+
+    def join(self, value, right):
+        """Joins like the map does, value is added once"""
+        if not super().join(value, right):
+            return False
+        self.get_node(value).set_item(1)
+        self.total += 1
+        return True
+
+    def remove(self, value):
+        """Removes one copy of value, if there is one"""
+        node = self.get_node(value)
+        if node is not False:
+            if node.item() > 1:
+                node.set_item(node.item() - 1)
+                self.total -= 1
+            else:
+                self.remove_node(node)
+
+    def insert_many(self, values):
+        """Adds one copy of every value, searching the sorted batch with finger_node"""
+        finger = self.nil
+        for value in sorted(values):
+            node = self.finger_node(finger, value)
+            if node == self.nil or node.value() != value:
+                node = self.attach(node, value)
+                node.set_item(0)
+            node.set_item(node.item() + 1)
+            self.total += 1
+            finger = node
+
+    def remove_many(self, values):
+        """Removes one copy of every value"""
+        for value in values:
+            self.remove(value)